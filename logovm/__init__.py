@@ -17,10 +17,19 @@
 
 """Initialize logovm module."""
 
+from threading import Lock
+
 __extensions__ = {}
+__extensions_lock__ = Lock()
 
 
 def register_extension(name, extension):
     """Register an extension for the LogoVM."""
-    global __extensions__  # pylint: disable=global-variable-not-assigned
-    __extensions__[name] = extension
+    with __extensions_lock__:
+        __extensions__[name] = extension
+
+
+def get_extension(name):
+    """Retrieve a registered extension, or None if it is not available."""
+    with __extensions_lock__:
+        return __extensions__.get(name)
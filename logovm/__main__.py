@@ -21,13 +21,20 @@ import logging
 
 import argparse
 
+import os
 import sys
 import importlib
 
-from logovm import __extensions__
+from logovm import get_extension
+from logovm.batch import BatchRunner
+from logovm.cache import ProgramCache
+from logovm.console import BufferedOutput, PrefetchedInput
 from logovm.loader import LogoVMLoader, DataTranslator
 from logovm.machine import LogoVM
-from logovm.errors import ExtensionError
+from logovm.optimizer import PeepholeOptimizer
+from logovm.profiler import Profiler
+from logovm.trace import TraceLogger
+from logovm.errors import ExtensionError, LoaderError
 
 
 def cli_parser():
@@ -47,7 +54,10 @@ def cli_parser():
         action="count",
         dest="debug",
         default=0,
-        help="Set debug mode. Add multiple times for increased detail.",
+        help=(
+            "Set debug mode. Add multiple times for increased detail."
+            " Executed instructions are logged with -dd."
+        ),
     )
     parser.add_argument(
         "-o",
@@ -58,13 +68,118 @@ def cli_parser():
         required=False,
         help="Set extension to use.",
     )
+    parser.add_argument(
+        "-e",
+        "--engine",
+        dest="engine",
+        choices=LogoVM.ENGINES,
+        default="threaded",
+        help="Set execution engine (default: threaded).",
+    )
+    parser.add_argument(
+        "--heap",
+        dest="heap",
+        choices=["list", "compact"],
+        default="list",
+        help="Set heap storage (default: list).",
+    )
+    parser.add_argument(
+        "-O",
+        "--optimize",
+        action="store_true",
+        dest="optimize",
+        default=False,
+        help="Optimize program code before execution.",
+    )
+    loading = parser.add_mutually_exclusive_group()
+    loading.add_argument(
+        "--lazy",
+        action="store_true",
+        dest="lazy",
+        default=False,
+        help="Decode instructions only when they are first executed.",
+    )
+    loading.add_argument(
+        "--packed",
+        action="store_true",
+        dest="packed",
+        default=False,
+        help="Store program code in compact arrays, to reduce memory use.",
+    )
+    loading.add_argument(
+        "--cache",
+        nargs="?",
+        const="",
+        default=None,
+        dest="cache",
+        metavar="DIR",
+        help=(
+            "Cache decoded (and optimized) programs in DIR"
+            f" (default: {ProgramCache.default_directory()})."
+        ),
+    )
+    parser.add_argument(
+        "--verify",
+        dest="verify",
+        choices=["on", "strict"],
+        default=None,
+        help=(
+            "Verify program before execution, disabling runtime checks if"
+            " successful. With 'strict', reject programs that fail."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        dest="profile",
+        action="store_true",
+        default=False,
+        help="Profile program execution, and print a hot spot report.",
+    )
+    parser.add_argument(
+        "--profile-interval",
+        dest="profile_interval",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Sample one every N instructions (default: 1, exact counts).",
+    )
+    parser.add_argument(
+        "--profile-output",
+        dest="profile_output",
+        default=None,
+        metavar="FILE",
+        help="Write the profile as JSON to FILE, instead of a report.",
+    )
+    parser.add_argument(
+        "--batch",
+        dest="batch",
+        default=None,
+        metavar="MANIFEST",
+        help=(
+            "Run the programs listed in MANIFEST, a JSON lines file, and"
+            " print the results as JSON lines."
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar="N",
+        help="Run batch programs in N processes (default: CPU count).",
+    )
     parser.add_argument(
         "program",
         metavar="PROGRAM",
+        nargs="?",
         help="Program to execute",
     )
 
-    return parser.parse_args()
+    options = parser.parse_args()
+    if (options.program is None) == (options.batch is None):
+        parser.error("either a PROGRAM or a batch MANIFEST is required")
+    return options
 
 
 def main():
@@ -75,31 +190,100 @@ def main():
 
     logging.basicConfig(level=debuglevel)
 
+    if options.batch:
+        return run_batch(options)
+
     try:
-        logovm = LogoVM()
-        with open(options.program, "rb") as progfile:
-            osinit, *machine_data = LogoVMLoader.load_program(
-                progfile, LogoVM.__version__
-            )
+        logovm = LogoVM(engine=options.engine, heap=options.heap)
+        osinit, *machine_data = load_program(options)
         logovm.setup(*machine_data)
-        if options.osname:
-            osname = options.osname[0]
-        else:
-            osname = DataTranslator.parse_data(osinit, [("name", "s")])["name"]
-        # load extension (currently limited to LogoVM provided ones).
-        importlib.import_module(f"logovm.{osname.lower()}")
-        # init extension
+        load_extension(logovm, osinit, options)
+        if debuglevel <= logging.DEBUG:
+            TraceLogger.install(logovm)
+        if options.verify:
+            logovm.verify(strict=options.verify == "strict")
+        profiler = None
+        if options.profile or options.profile_output:
+            profiler = Profiler(logovm, options.profile_interval)
+            profiler.install()
+        output = BufferedOutput(sys.stdout)
         try:
-            extension = __extensions__[osname]
-        except KeyError:
-            raise ExtensionError(f"Invalid extension: {osname}") from None
-        extension(logovm, osinit)
-        logovm.execute()
+            logovm.execute(
+                stdin=PrefetchedInput(sys.stdin, output), stdout=output
+            )
+        finally:
+            output.flush()
+        if profiler:
+            write_profile(profiler, options)
         return 0
-    except FileNotFoundError as fnfe:
-        print(fnfe, file=sys.stderr)
+    except (FileNotFoundError, LoaderError) as error:
+        print(error, file=sys.stderr)
     return 1
 
 
+def load_program(options):
+    """Load, and optimize, the program to execute."""
+    with open(options.program, "rb") as progfile:
+        if options.cache is not None:
+            cache = ProgramCache(options.cache or None)
+            return cache.load_program(
+                progfile, LogoVM.__version__, options.optimize
+            )
+        osinit, code, data, debug = LogoVMLoader.load_program(
+            progfile,
+            LogoVM.__version__,
+            lazy=options.lazy,
+            packed=options.packed,
+        )
+    if options.optimize:
+        origins = []
+        code = PeepholeOptimizer.optimize(code, origins)
+        debug = debug.relocated(origins)
+    return osinit, code, data, debug
+
+
+def load_extension(logovm, osinit, options):
+    """Load and initialize the extension used by the program."""
+    if options.osname:
+        osname = options.osname[0]
+    else:
+        osname = DataTranslator.parse_data(osinit, [("name", "s")])["name"]
+    # load extension (currently limited to LogoVM provided ones).
+    importlib.import_module(f"logovm.{osname.lower()}")
+    # init extension
+    extension = get_extension(osname)
+    if extension is None:
+        raise ExtensionError(f"Invalid extension: {osname}")
+    extension(logovm, osinit)
+
+
+def write_profile(profiler, options):
+    """Write the profile as JSON, or print the hot spot report."""
+    if options.profile_output:
+        with open(options.profile_output, "wt", encoding="utf-8") as out:
+            profiler.write_json(out)
+    else:
+        print(profiler.format_report(), file=sys.stderr)
+
+
+def run_batch(options):
+    """Execute the programs of a batch manifest."""
+    runner = BatchRunner(
+        options.jobs,
+        engine=options.engine,
+        optimize=options.optimize,
+        cache=options.cache,
+    )
+    try:
+        with open(options.batch, "rt", encoding="utf-8") as manifest:
+            jobs = BatchRunner.read_manifest(
+                manifest, os.path.dirname(options.batch)
+            )
+    except (FileNotFoundError, LoaderError) as error:
+        print(error, file=sys.stderr)
+        return 1
+    return runner.write_results(jobs, sys.stdout)
+
+
 if __name__ == "__main__":
     main()
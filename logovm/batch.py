@@ -0,0 +1,154 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Batch execution of many programs, over a process pool."""
+
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from logovm.cache import ProgramCache
+from logovm.errors import ExtensionError, LoaderError
+from logovm.machine import LogoVM
+from logovm.pool import ProgramImage, VMPool
+
+# Machine pools of the programs loaded by this process.
+__pools = {}
+
+
+class BatchRunner:
+    """
+    Run the jobs of a batch manifest.
+
+    A manifest has one JSON object per line, with the 'program' file
+    name, relative to the manifest directory, and the optional 'input'
+    text, 'expected' output and job 'id'. Each job yields a result with
+    its status ('passed', 'failed' or 'error'), exit code, output,
+    error output, number of executed instructions and wall time.
+    Programs are loaded once per worker process, and run by a pooled
+    machine, reset after every job.
+    """
+
+    def __init__(self, jobs=1, **options):
+        """
+        Initialize runner.
+
+        Available options:
+
+            engine: Execution engine. (Default to "threaded")
+            optimize: Optimize program code. (Default to False)
+            cache: Program cache directory, shared by the workers.
+        """
+        self.jobs = jobs
+        self.options = options
+
+    @staticmethod
+    def read_manifest(manifest, directory=""):
+        """Read jobs from a manifest stream."""
+        jobs = []
+        for number, line in enumerate(manifest, 1):
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+                job["program"] = os.path.join(directory, job["program"])
+            except (ValueError, TypeError, KeyError):
+                raise LoaderError(
+                    f"Invalid manifest entry at line {number}."
+                ) from None
+            job.setdefault("id", number)
+            jobs.append(job)
+        return jobs
+
+    def run(self, jobs):
+        """Run jobs, yielding their results in order."""
+        tasks = [(job, self.options) for job in jobs]
+        if self.jobs <= 1:
+            yield from map(run_job, tasks)
+            return
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            chunksize = max(1, len(tasks) // (self.jobs * 4))
+            yield from executor.map(run_job, tasks, chunksize=chunksize)
+
+    def write_results(self, jobs, output):
+        """Run jobs, writing results as JSON lines, return exit code."""
+        status = 0
+        for result in self.run(jobs):
+            print(json.dumps(result), file=output, flush=True)
+            status = status or result["exit"]
+        return status
+
+
+def load_pool(filename, options):
+    """Retrieve the machine pool of a program loaded by this process."""
+    key = (filename, bool(options.get("optimize")))
+    pool = __pools.get(key)
+    if pool is None:
+        with open(filename, "rb") as progfile:
+            if options.get("cache") is not None:
+                cache = ProgramCache(options["cache"] or None)
+                image = ProgramImage(
+                    *cache.load_program(progfile, LogoVM.__version__, key[1])
+                )
+            else:
+                image = ProgramImage.load(progfile, key[1])
+        pool = __pools[key] = VMPool(
+            image, size=1, engine=options.get("engine", "threaded")
+        )
+    return pool
+
+
+def run_job(task):
+    """Run a single batch job, and return its result."""
+    job, options = task
+    start = time.perf_counter()
+    try:
+        output, error, instructions = execute_job(job, options)
+    except (OSError, TypeError, LoaderError, ExtensionError) as exception:
+        output, error, instructions = "", str(exception), 0
+    if error:
+        status = "error"
+    elif job.get("expected") is not None and output != job["expected"]:
+        status = "failed"
+    else:
+        status = "passed"
+    return {
+        "id": job["id"],
+        "program": job["program"],
+        "status": status,
+        "exit": 0 if status == "passed" else 1,
+        "output": output,
+        "error": error,
+        "instructions": instructions,
+        "time": time.perf_counter() - start,
+    }
+
+
+def execute_job(job, options):
+    """Execute a job program, return its output, errors and count."""
+    with (
+        load_pool(job["program"], options).machine() as machine,
+        io.StringIO(job.get("input") or "") as stdin,
+        io.StringIO() as stdout,
+        io.StringIO() as stderr,
+    ):
+        # run() counts instructions, using the selected engine.
+        machine.start(stdin=stdin, stdout=stdout, stderr=stderr)
+        machine.run()
+        return stdout.getvalue(), stderr.getvalue(), machine.instructions
@@ -0,0 +1,157 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""On-disk cache of loaded programs."""
+
+import os
+import hashlib
+import logging
+import marshal
+import struct
+import tempfile
+
+from logovm.loader import LogoVMLoader, DebugInfo
+from logovm.optimizer import PeepholeOptimizer
+
+
+class ProgramCache:
+    """
+    Cache of decoded, and optionally optimized, programs.
+
+    Entries are keyed by the SHA-256 of the program file, the VM version
+    and the optimization flag, and store the result of load_program
+    serialized with marshal, after a versioned header. When the cache
+    grows over 'max_size' bytes, the least recently used entries, by
+    file modification time, are removed.
+    """
+
+    MAGIC = b"LVMC"
+    FORMAT = 1
+    HEADER = struct.Struct("<4sHH")
+    SUFFIX = ".lvmc"
+
+    def __init__(self, directory=None, max_size=64 * 2**20):
+        """Initialize cache in 'directory'."""
+        if directory is None:
+            directory = ProgramCache.default_directory()
+        self.directory = directory
+        self.max_size = max_size
+
+    @staticmethod
+    def default_directory():
+        """Retrieve the default cache directory."""
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        return os.path.join(base, "logovm")
+
+    @staticmethod
+    def key(program, version, optimize=False):
+        """Compute the cache key for the program bytes."""
+        digest = hashlib.sha256(program)
+        digest.update(bytes(version))
+        digest.update(b"O" if optimize else b"-")
+        return digest.hexdigest()
+
+    def load_program(self, inputstream, min_version, optimize=False):
+        """Load program from stream, using the cache if possible."""
+        program = inputstream.read()
+        path = os.path.join(
+            self.directory,
+            ProgramCache.key(program, min_version, optimize) + self.SUFFIX,
+        )
+        entry = self.__read(path)
+        if entry is not None:
+            return entry
+        osinit, code, data, debug = LogoVMLoader.load_buffer(
+            program, min_version
+        )
+        if optimize:
+            origins = []
+            code = PeepholeOptimizer.optimize(code, origins)
+            debug = debug.relocated(origins)
+        self.__write(path, (osinit, code, data, debug))
+        self.evict()
+        return osinit, code, data, debug
+
+    def __read(self, path):
+        try:
+            with open(path, "rb") as entry:
+                content = entry.read()
+            magic, version, marshal_version = self.HEADER.unpack_from(content)
+            if (magic, version, marshal_version) != (
+                self.MAGIC,
+                self.FORMAT,
+                marshal.version,
+            ):
+                return None
+            osinit, code, data, debug, origins = marshal.loads(
+                memoryview(content)[self.HEADER.size :]
+            )
+            os.utime(path)
+        except (OSError, ValueError, EOFError, TypeError, struct.error):
+            return None
+        logging.debug("LogoVM: Program cache hit: %s", path)
+        return osinit, code, data, DebugInfo(debug, origins)
+
+    def __write(self, path, program):
+        osinit, code, data, debug = program
+        content = marshal.dumps(
+            (osinit, code, data, bytes(debug.data), debug.origins)
+        )
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                dir=self.directory, delete=False
+            ) as entry:
+                try:
+                    entry.write(
+                        self.HEADER.pack(
+                            self.MAGIC, self.FORMAT, marshal.version
+                        )
+                    )
+                    entry.write(content)
+                    entry.close()
+                    os.replace(entry.name, path)
+                except OSError:
+                    os.unlink(entry.name)  # do not leave partial entries
+                    raise
+        except OSError as error:
+            logging.warning("LogoVM: Cannot write program cache: %s", error)
+
+    def evict(self):
+        """Remove least recently used entries, if cache is too big."""
+        try:
+            stats = sorted(
+                (
+                    (entry.stat(), entry.path)
+                    for entry in os.scandir(self.directory)
+                    if entry.name.endswith(self.SUFFIX)
+                ),
+                key=lambda item: item[0].st_mtime,
+            )
+        except OSError:  # pragma: no cover
+            return
+        total = sum(stat.st_size for stat, _ in stats)
+        for stat, path in stats:
+            if total <= self.max_size:
+                break
+            try:
+                os.unlink(path)
+            except OSError:  # pragma: no cover
+                continue
+            total -= stat.st_size
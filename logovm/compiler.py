@@ -0,0 +1,396 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Compile LogoVM code basic blocks into Python code objects."""
+
+import math
+
+from logovm.errors import LogoVMError, LogoVMInvalidAccess, ExtensionError
+from logovm.optimizer import PeepholeOptimizer
+from logovm.rope import STRING_TYPES, concat
+
+# Conditions on R0 used by conditional jumps and skips.
+JUMPS = {
+    129: None,  # JP
+    130: "< 0",  # JLESS
+    131: "> 0",  # JMORE
+    132: "== 0",  # JZ
+    133: "!= 0",  # JNZ
+}
+SKIPS = {
+    6: "== 0",  # SKIPZ
+    7: "!= 0",  # SKIPNZ
+}
+BINOPS = {
+    30: "+",  # ADD
+    31: "-",  # SUB
+    32: "*",  # MUL
+    33: "/",  # DIV
+    35: "**",  # POW
+}
+BITOPS = {
+    41: "&",  # AND
+    42: "|",  # OR
+    43: "^",  # XOR
+    44: ">>",  # SHFTR
+    45: "<<",  # SHFTL
+}
+UNARY = {
+    10: ("int", "int"),  # INT
+    11: ("float", "float"),  # FLOAT
+    12: ("str", "str"),  # STRING
+    16: ("abs", None),  # ABS
+}
+CALL, JR, HALT, RET = 134, 161, 1, 2
+# Statements that end a block with other branches, from their address
+# and arguments.
+BRANCHES = {
+    CALL: lambda pc, args: f"callstack.append({pc}); return {args[0]}",
+    JR: lambda pc, args: f"return {pc + args[0]}",
+    HALT: lambda pc, args: f"vm.running = False; return {pc + 1}",
+    RET: lambda pc, args: "return callstack.pop() + 1",
+}
+NUMBER = ("int", "float", "number")
+
+
+class BlockCompiler:
+    """
+    Compile LogoVM code into one Python function per basic block.
+
+    Values are kept in local variables inside a block and are only
+    pushed to the machine stack when the block ends, or before an
+    operation that needs the machine stack (e.g. INTR). As a result
+    registers R1-R3 are not updated by compiled blocks, and the stack
+    limit is only checked for values pushed to the machine stack.
+    """
+
+    def __init__(self, logo_vm):
+        """Initialize the compiler for the code loaded in logo_vm."""
+        self.vm = logo_vm
+        self.code = logo_vm.code
+        self.leaders = self.find_leaders(self.code)
+        self.blocks = {}
+        self.sizes = {}
+        self.namespace = None
+        self.constants = 0
+
+    @staticmethod
+    def find_leaders(code):
+        """Find the instructions that start a basic block."""
+        leaders = {0}
+        for pc, instruction in enumerate(code):
+            cmd, *args = PeepholeOptimizer.expand(instruction)[-1]
+            if cmd in JUMPS or cmd == CALL:
+                leaders.update((args[0], pc + 1))
+            elif cmd == JR:
+                leaders.update((pc + args[0], pc + 1))
+            elif cmd in SKIPS:
+                leaders.update((pc + 1, pc + 2))
+            elif cmd in (HALT, RET):
+                leaders.add(pc + 1)
+        return leaders
+
+    def run(self):
+        """
+        Execute compiled blocks while the machine is running.
+
+        Executed instructions are added to the machine instruction count.
+        """
+        logo_vm = self.vm
+        blocks = self.blocks
+        sizes = self.sizes
+        regs = logo_vm.regs
+        pc = regs[-1] + 1
+        executed = 0
+        try:
+            while logo_vm.running:
+                regs[-1] = pc
+                try:
+                    block = blocks[pc]
+                except KeyError:
+                    block = self.compile_block(pc)
+                executed += sizes[pc]
+                pc = block()
+        finally:
+            logo_vm.instructions += executed
+
+    def compile_block(self, start):
+        """Compile the basic block starting at 'start'."""
+        if not 0 <= start < len(self.code):
+            raise LogoVMError(f"Invalid PC: {start}")  # pragma: no cover
+        if self.namespace is None:
+            self.namespace = self.__namespace()
+        builder = _BlockBuilder(self, start)
+        source = builder.build()
+        exec(  # pylint: disable=exec-used
+            compile(source, f"<logovm block {start}>", "exec"),
+            self.namespace,
+        )
+        self.blocks[start] = self.namespace.pop(f"block_{start}")
+        self.sizes[start] = builder.size
+        return self.blocks[start]
+
+    def __namespace(self):
+        logo_vm = self.vm
+        return {
+            "vm": logo_vm,
+            "regs": logo_vm.regs,
+            "heap": logo_vm.mem.heap,
+            "push": logo_vm.mem.push,
+            "pop": logo_vm.mem.pop,
+            "callstack": logo_vm.callstack,
+            "intr": logo_vm.intr,
+            "NUM": (int, float),
+            "STR": STRING_TYPES,
+            "concat": concat,
+            "LogoVMError": LogoVMError,
+            "ExtensionError": ExtensionError,
+            "LogoVMInvalidAccess": LogoVMInvalidAccess,
+        }
+
+    def add_constant(self, value):
+        """Add a value to the namespace of compiled blocks."""
+        name = f"_k{self.constants}"
+        self.constants += 1
+        self.namespace[name] = value
+        return name
+
+
+class _BlockBuilder:  # pylint: disable=too-few-public-methods
+    """Generate the Python source for a single basic block."""
+
+    def __init__(self, compiler, start):
+        self.compiler = compiler
+        self.start = start
+        self.lines = []
+        self.vstack = []  # (expression, kind) pairs
+        self.temps = 0
+        self.constants = []
+        self.size = 0
+        self.emitters = self.__build_emitters()
+
+    def build(self):
+        """Generate source for the block."""
+        code = self.compiler.code
+        pc = self.start
+        while True:
+            if pc >= len(code) or (
+                pc != self.start and pc in self.compiler.leaders
+            ):
+                self.__spill()
+                self.__emit(f"return {pc}")
+                break
+            ends = any(
+                self.__instruction(pc, *instruction)
+                for instruction in PeepholeOptimizer.expand(code[pc])
+            )
+            pc += 1
+            if ends:
+                break
+        self.size = pc - self.start
+        names = ("vm", "regs", "heap", "push", "pop", "callstack", "intr")
+        names += ("NUM", "LogoVMError", "ExtensionError")
+        names += ("LogoVMInvalidAccess", *self.constants)
+        args = ", ".join(f"{name}={name}" for name in names)
+        body = "\n".join(f"    {line}" for line in self.lines)
+        return f"def block_{self.start}({args}):\n{body}\n"
+
+    def __emit(self, line):
+        self.lines.append(line)
+
+    def __temp(self, expression, kind=None):
+        name = f"_t{self.temps}"
+        self.temps += 1
+        self.__emit(f"{name} = {expression}")
+        self.vstack.append((name, kind))
+
+    def __const(self, value):
+        if isinstance(value, float) and not math.isfinite(value):
+            return self.__add_constant(value)
+        return repr(value)
+
+    def __add_constant(self, value):
+        name = self.compiler.add_constant(value)
+        self.constants.append(name)
+        return name
+
+    def __spill(self):
+        for expression, _ in self.vstack:
+            self.__emit(f"push({expression})")
+        self.vstack = []
+
+    def __operands(self, count):
+        """Retrieve 'count' operands, from bottom to top of stack."""
+        missing = count - len(self.vstack)
+        if missing > 0:
+            values = []
+            for _ in range(missing):
+                name = f"_t{self.temps}"
+                self.temps += 1
+                self.__emit(f"{name} = pop()")
+                values.insert(0, (name, None))
+            self.vstack[:0] = values
+        operands = self.vstack[-count:]
+        del self.vstack[-count:]
+        return operands
+
+    def __check(self, operands, types, kinds):
+        for expression, kind in operands:
+            if kind not in kinds:
+                self.__emit(
+                    f"if not isinstance({expression}, {types}):  "
+                    "raise ValueError('Invalid data type for operation.')"
+                )
+
+    def __generic(self, pc, cmd, args):
+        """Execute an instruction using the machine operation table."""
+        self.__spill()
+        operation = self.compiler.vm.get_operation(cmd)
+        if operation is None:  # pragma: no cover
+            self.__emit(f"raise LogoVMError('Invalid command: {cmd}')")
+            return True
+        name = self.__add_constant(operation)
+        arglist = ", ".join(self.__const(arg) for arg in args)
+        self.__emit(f"regs[-1] = {pc}")
+        self.__emit(f"{name}({arglist})")
+        return False
+
+    def __instruction(self, pc, cmd, *args):
+        """Emit code for one instruction, return True if block ends."""
+        emitter = self.emitters.get(cmd, self.__generic)
+        return bool(emitter(pc, cmd, args))
+
+    def __build_emitters(self):
+        """Build the table of code emitters, indexed by command."""
+        emitters = {
+            0: lambda pc, cmd, args: None,  # NOP
+            8: self.__pop,  # POP
+            9: self.__dup,  # DUP
+            17: self.__not,  # NOT
+            24: self.__swap,  # SWAP
+            25: self.__cmp,  # CMP
+            125: self.__cat,  # CAT
+            128: self.__heap_access,  # LOAD
+            140: self.__heap_access,  # STORE
+            159: self.__intr,  # INTR
+            160: self.__push,  # PUSHI
+            192: self.__push,  # PUSHD
+            224: self.__push,  # PUSHS
+        }
+        emitters.update(dict.fromkeys(UNARY, self.__unary))
+        emitters.update(dict.fromkeys(BINOPS, self.__binop))
+        emitters.update(dict.fromkeys(BITOPS, self.__bitop))
+        branches = (*JUMPS, *SKIPS, CALL, JR, HALT, RET)
+        emitters.update(dict.fromkeys(branches, self.__end))
+        return emitters
+
+    def __end(self, pc, cmd, args):
+        """Emit a branch, that ends the block."""
+        self.__spill()
+        self.__emit(f"regs[-1] = {pc}")
+        self.__emit(self.__branch(pc, cmd, args))
+        return True
+
+    def __push(self, _pc, cmd, args):
+        kinds = {160: "int", 192: "float", 224: "str"}
+        self.vstack.append((self.__const(args[0]), kinds[cmd]))
+
+    def __pop(self, _pc, _cmd, _args):
+        self.__operands(1)
+
+    def __dup(self, _pc, _cmd, _args):
+        (value,) = self.__operands(1)
+        self.vstack.extend((value, value))
+
+    def __swap(self, _pc, _cmd, _args):
+        lhs, rhs = self.__operands(2)
+        self.vstack.extend((rhs, lhs))
+
+    def __unary(self, _pc, cmd, _args):
+        ((value, _),) = self.__operands(1)
+        function, kind = UNARY[cmd]
+        self.__temp(f"{function}({value})", kind)
+
+    def __binop(self, _pc, cmd, _args):
+        operands = self.__operands(2)
+        self.__check(operands, "NUM", NUMBER)
+        (lhs, lkind), (rhs, rkind) = operands
+        kind = "number"
+        if lkind == rkind == "int" and cmd != 33:
+            kind = "int" if cmd != 35 else "number"
+        elif "float" in (lkind, rkind):
+            kind = "float"
+        self.__temp(f"{lhs} {BINOPS[cmd]} {rhs}", kind)
+
+    def __bitop(self, _pc, cmd, _args):
+        operands = self.__operands(2)
+        self.__check(operands, "int", ("int",))
+        (lhs, _), (rhs, _) = operands
+        self.__temp(f"{lhs} {BITOPS[cmd]} {rhs}", "int")
+
+    def __not(self, _pc, _cmd, _args):
+        operands = self.__operands(1)
+        self.__check(operands, "int", ("int",))
+        self.__temp(f"~{operands[0][0]}", "int")
+
+    def __cmp(self, _pc, _cmd, _args):
+        (lhs, _), (rhs, _) = self.__operands(2)
+        self.__emit(
+            f"regs[0] = -1 if {lhs} < {rhs} else "
+            f"(1 if {lhs} > {rhs} else 0)"
+        )
+
+    def __cat(self, _pc, _cmd, _args):
+        operands = self.__operands(2)
+        self.__check(operands, "STR", ("str",))
+        (lhs, _), (rhs, _) = operands
+        self.__temp(f"concat({lhs}, {rhs})", "str")
+
+    def __intr(self, pc, _cmd, args):
+        self.__spill()
+        self.__emit(f"regs[-1] = {pc}")
+        if 0 <= args[0] < len(self.compiler.vm.intr):
+            self.__emit(f"intr[{args[0]}](vm)")
+        else:  # pragma: no cover
+            self.__emit(
+                "raise ExtensionError(" f"'Invalid interruption: {args[0]}')"
+            )
+
+    def __heap_access(self, _pc, cmd, args):
+        addr = args[0]
+        heap = self.compiler.vm.mem.heap or []
+        if not 0 <= addr < len(heap):  # pragma: no cover
+            self.__spill()
+            self.__emit(
+                f"raise LogoVMInvalidAccess('Invalid heap address: {addr}')"
+            )
+        elif cmd == 128:  # LOAD
+            self.__temp(f"heap[{addr}]")
+        else:  # STORE
+            ((value, _),) = self.__operands(1)
+            self.__emit(f"heap[{addr}] = {value}")
+
+    @staticmethod
+    def __branch(pc, cmd, args):
+        """Return the statement that ends a block."""
+        if cmd in JUMPS:
+            if JUMPS[cmd] is None:
+                return f"return {args[0]}"
+            return f"return {args[0]} if regs[0] {JUMPS[cmd]} else {pc + 1}"
+        if cmd in SKIPS:
+            return f"return {pc + 2} if regs[0] {SKIPS[cmd]} else {pc + 1}"
+        return BRANCHES[cmd](pc, args)
@@ -0,0 +1,192 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Buffered, and asynchronous, console streams for LogoVM machines."""
+
+import asyncio
+import codecs
+import os
+import stat
+from collections import deque
+
+
+class BufferedOutput:
+    """
+    Output stream that writes to 'stream' in large blocks.
+
+    Text is kept in memory until 'threshold' characters are buffered,
+    or the buffer is flushed, which LogoVM does when a program stops.
+    """
+
+    def __init__(self, stream, threshold=2**16):
+        """Initialize buffer for 'stream'."""
+        self.stream = stream
+        self.threshold = threshold
+        self.buffer = []
+        self.size = 0
+
+    def write(self, text):
+        """Write text to the buffer."""
+        self.buffer.append(text)
+        self.size += len(text)
+        if self.size >= self.threshold:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        """Write buffered text to the stream."""
+        if self.buffer:
+            text = "".join(self.buffer)
+            self.buffer.clear()
+            self.size = 0
+            self.stream.write(text)
+        self.stream.flush()
+
+
+class PrefetchedInput:
+    """
+    Input stream that reads lines from 'stream' in large blocks.
+
+    Regular files, and in-memory streams, are read 'chunk_size'
+    characters at a time, and split into lines at once. Terminals and
+    pipes, that may wait for an interactive user, are read one line at
+    a time. If an 'output' stream is given, it is flushed before any
+    read that may block, so prompts are shown before waiting.
+    """
+
+    def __init__(self, stream, output=None, chunk_size=2**16):
+        """Initialize input from 'stream'."""
+        self.stream = stream
+        self.output = output
+        if not PrefetchedInput.prefetchable(stream):
+            chunk_size = 0
+        self.chunk_size = chunk_size
+        self.lines = deque()
+        self.partial = ""
+
+    @staticmethod
+    def prefetchable(stream):
+        """Check if reading blocks of 'stream' never waits for a user."""
+        try:
+            return stat.S_ISREG(os.fstat(stream.fileno()).st_mode)
+        except (AttributeError, OSError, ValueError):
+            return hasattr(stream, "getvalue")  # e.g. StringIO
+
+    def readline(self):
+        """Retrieve the next line, or an empty string at end of file."""
+        if not self.lines:
+            self.__fill()
+        return self.lines.popleft() if self.lines else ""
+
+    def __fill(self):
+        if self.output is not None:
+            self.output.flush()
+        if not self.chunk_size:
+            self.lines.append(self.stream.readline())
+            return
+        while not self.lines:
+            chunk = self.stream.read(self.chunk_size)
+            if not chunk:
+                if self.partial:
+                    self.lines.append(self.partial)
+                    self.partial = ""
+                return
+            *lines, self.partial = (self.partial + chunk).split("\n")
+            self.lines.extend(f"{line}\n" for line in lines)
+
+
+class SessionInput:
+    """
+    Console input fed by the session owner.
+
+    readline() returns None while no line is available, which suspends
+    a READ interrupt, and an empty string after the input is closed.
+    """
+
+    def __init__(self):
+        """Initialize an empty input."""
+        self.lines = deque()
+        self.partial = ""
+        self.closed = False
+        self.ready = asyncio.Event()
+
+    def feed(self, text):
+        """Add text to the input."""
+        *lines, self.partial = (self.partial + text).split("\n")
+        self.lines.extend(f"{line}\n" for line in lines)
+        if self.lines:
+            self.ready.set()
+
+    def close(self):
+        """Close the input, remaining text is the last line."""
+        if self.partial:
+            self.lines.append(self.partial)
+            self.partial = ""
+        self.closed = True
+        self.ready.set()
+
+    def readline(self):
+        """Retrieve the next line, or None if it is not available."""
+        if self.lines:
+            return self.lines.popleft()
+        if self.closed:
+            return ""
+        self.ready.clear()
+        return None
+
+
+class StreamInput(SessionInput):
+    """Console input fed from an asyncio StreamReader."""
+
+    def __init__(self, reader, encoding="utf-8"):
+        """Initialize input from 'reader'."""
+        super().__init__()
+        self.reader = reader
+        self.decoder = codecs.getincrementaldecoder(encoding)()
+
+    async def pump(self):
+        """Feed the input with data from the reader, until end of file."""
+        while data := await self.reader.read(2**16):
+            self.feed(self.decoder.decode(data))
+        self.feed(self.decoder.decode(b"", final=True))
+        self.close()
+
+
+class StreamOutput(BufferedOutput):
+    """
+    Buffered console output to an asyncio StreamWriter.
+
+    Flushing hands the text to the writer transport, without blocking,
+    and drain() waits for it to be sent.
+    """
+
+    def __init__(self, writer, threshold=2**16, encoding="utf-8"):
+        """Initialize output to 'writer'."""
+        super().__init__(writer, threshold)
+        self.encoding = encoding
+
+    def flush(self):
+        """Send buffered text to the writer."""
+        if self.buffer:
+            text = "".join(self.buffer)
+            self.buffer.clear()
+            self.size = 0
+            self.stream.write(text.encode(self.encoding))
+
+    async def drain(self):
+        """Wait until the writer buffer is sent."""
+        await self.stream.drain()
@@ -40,3 +40,34 @@ class LogoVMOSError(Exception):
 
 class LogoVMError(Exception):
     """Generic error for the LogoVM."""
+
+
+class LogoVMInvalidAccess(LogoVMError):
+    """Invalid data access."""
+
+
+class LogoVMEmptyStack(LogoVMInvalidAccess):
+    """Stack underflow error."""
+
+
+class LogoVMStackOverflow(LogoVMError):
+    """Stack overflow error."""
+
+
+class LogoVMSuspend(Exception):
+    """
+    Execution suspended by an interrupt, e.g. waiting for input.
+
+    When execution is resumed, 'resume(logo_vm)' is called to complete
+    the interrupt, before the next instruction.
+    """
+
+    def __init__(self, reason, resume=None):
+        """Initialize with the suspension reason and resume function."""
+        super().__init__(reason)
+        self.reason = reason
+        self.resume = resume or (lambda logo_vm: None)
+
+
+class VerificationError(LoaderError):
+    """Program failed bytecode verification."""
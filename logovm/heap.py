@@ -0,0 +1,100 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Compact heap storage for LogoVM."""
+
+from array import array
+
+INT, FLOAT, OBJECT = 0, 1, 2
+INT_RANGE = range(-(2**63), 2**63)
+
+
+class CompactHeap:
+    """
+    Heap storing numbers in native arrays instead of Python objects.
+
+    Every slot has an 8-byte payload, in an array('q') for integers,
+    that is also viewed as an array of doubles for float slots, and a
+    one byte kind. Strings, and any other value, are stored in a list,
+    and the slot payload holds its index.
+    """
+
+    def __init__(self, values=()):
+        """Initialize heap with the given values."""
+        values = list(values)
+        self.kinds = bytearray(len(values))
+        self.ints = array("q", bytes(8 * len(values)))
+        self.floats = memoryview(self.ints).cast("B").cast("d")
+        self.objects = []
+        self.free = []
+        for addr, value in enumerate(values):
+            self[addr] = value
+
+    def __len__(self):
+        """Return the number of heap slots."""
+        return len(self.kinds)
+
+    def __iter__(self):
+        """Iterate over heap values."""
+        return (self[addr] for addr in range(len(self)))
+
+    def __getitem__(self, addr):
+        """Retrieve the value at 'addr'."""
+        kind = self.kinds[addr]
+        if kind == INT:
+            return self.ints[addr]
+        if kind == FLOAT:
+            return self.floats[addr]
+        return self.objects[self.ints[addr]]
+
+    def __setitem__(self, addr, value):
+        """Store value at 'addr'."""
+        # exact types, so that subclasses (e.g. bool, an int) are stored
+        # as objects, and retrieved with their own type.
+        # pylint: disable=unidiomatic-typecheck
+        kind = self.kinds[addr]
+        if type(value) is int and value in INT_RANGE:
+            if kind == OBJECT:
+                self.__release(addr)
+            self.kinds[addr] = INT
+            self.ints[addr] = value
+        elif type(value) is float:
+            if kind == OBJECT:
+                self.__release(addr)
+            self.kinds[addr] = FLOAT
+            self.floats[addr] = value
+        elif kind == OBJECT:
+            self.objects[self.ints[addr]] = value
+        else:
+            if self.free:
+                index = self.free.pop()
+                self.objects[index] = value
+            else:
+                index = len(self.objects)
+                self.objects.append(value)
+            self.kinds[addr] = OBJECT
+            self.ints[addr] = index
+
+    def __release(self, addr):
+        index = self.ints[addr]
+        self.objects[index] = None
+        self.free.append(index)
+
+    @property
+    def nbytes(self):
+        """Approximate memory used by the heap storage, in bytes."""
+        return len(self.kinds) + self.ints.itemsize * len(self.ints)
@@ -19,11 +19,46 @@
 
 import logging
 
+import lzma
+import mmap
 import struct
-from io import BytesIO  # pylint: disable=no-name-in-module
+import sys
+import zlib
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
 
 from logovm.errors import InvalidLogoFile
 
+DATA_SIZES = {
+    "B": 1,
+    "b": 1,
+    "H": 2,
+    "Q": 8,
+    "q": 8,
+    "d": 8,
+}
+UINT64 = struct.Struct("<Q")
+INT64 = struct.Struct("<q")
+DOUBLE = struct.Struct("<d")
+# Argument unpacking functions, indexed by 'opcode >> 5'.
+ARGUMENTS = (
+    [None] * 4
+    + [UINT64.unpack_from, INT64.unpack_from, DOUBLE.unpack_from]
+    + [None]
+)
+# Instructions without arguments are shared.
+NO_ARGS = [(cmd,) for cmd in range(128)]
+# Fixed width instruction record, since version 0.3.
+RECORD = struct.Struct("<Bq")
+RECORDS_VERSION = (0, 3)
+# Compressed section header: compressed and uncompressed sizes.
+COMPRESSED = struct.Struct("<QQ")
+ZLIB, LZMA = 1, 2
+CHUNK_SIZE = 2**20
+# Maximum decompressed size of a section, for each compressed byte.
+MAX_RATIO = 2**14
+
 
 class DataTranslator:
     """Provide methods to handle machine data."""
@@ -51,15 +86,7 @@ class DataTranslator:
         """Read a number from datastream with the specified datatype."""
         if not isinstance(datatype, str):
             datatype = datatype.decode("utf-8")
-        data_sizes = {
-            "B": 1,
-            "b": 1,
-            "H": 2,
-            "Q": 8,
-            "q": 8,
-            "d": 8,
-        }
-        datasz = data_sizes[datatype]
+        datasz = DATA_SIZES[datatype]
         return (
             DataTranslator.translate_data(datastream.read(datasz), datatype),
             datasz,
@@ -80,43 +107,390 @@ class DataTranslator:
             string.extend(char)
         return bytes(string).decode("utf-8"), bytes_read
 
+    @staticmethod
+    def unpack_number(buffer, offset, datatype):
+        """Unpack a number from buffer at offset, return (value, size)."""
+        try:
+            value = struct.unpack_from(f"<{datatype}", buffer, offset)[0]
+        except struct.error:  # pragma: no cover
+            raise InvalidLogoFile("Truncated data.") from None
+        return value, DATA_SIZES[datatype]
+
+    @staticmethod
+    def unpack_string(buffer, offset, end=None):
+        """Unpack a zero-terminated string, return (value, size)."""
+        if end is None:
+            end = len(buffer)
+        stop = buffer.find(b"\0", offset, end)
+        if stop < 0:  # pragma: no cover
+            raise InvalidLogoFile("Unterminated String data.")
+        return str(buffer[offset:stop], "utf-8"), stop - offset + 1
+
     @staticmethod
     def parse_data(data, records):
         """Parse data given with the record definitions."""
         _res = {}
-        with BytesIO(data) as datastream:
-            for name, datatype in records:
-                logging.debug("Data load: %s - %s", name, datatype)
-                if datatype == "s":
-                    _res[name], _ = DataTranslator.read_string(datastream)
-                else:
-                    _res[name], _ = DataTranslator.read_number(
-                        datastream, datatype
-                    )
+        offset = 0
+        for name, datatype in records:
+            logging.debug("Data load: %s - %s", name, datatype)
+            if datatype == "s":
+                _res[name], size = DataTranslator.unpack_string(data, offset)
+            else:
+                _res[name], size = DataTranslator.unpack_number(
+                    data, offset, datatype
+                )
+            offset += size
         return _res
 
 
+class DebugInfo:
+    """
+    Debug information from the '.DBUG' section of a program.
+
+    Records are only decoded when some information is requested. If
+    the code was rewritten (e.g. optimized), 'origins' maps each
+    instruction to the PC of the original instruction.
+    """
+
+    def __init__(self, data=b"", origins=None):
+        """Initialize debug information from the section data."""
+        self.data = data
+        self.origins = origins
+        self.__records = None
+
+    def __bool__(self):
+        """Check if any debug record is available."""
+        return bool(self.data)
+
+    def relocated(self, origins):
+        """Return debug information for rewritten code."""
+        if self.origins is not None:
+            origins = [self.origins[pc] for pc in origins]
+        return DebugInfo(self.data, origins)
+
+    @property
+    def data_symbols(self):
+        """List of (name, type) of the program data, by heap address."""
+        return self.__decode()[0]
+
+    def location(self, pc):
+        """Retrieve the (file, line) of the instruction at 'pc', or None."""
+        entry = self.__lookup(self.__decode()[1], pc)
+        return entry[1:] if entry else None
+
+    def symbol(self, pc):
+        """Retrieve (name, offset) of the symbol containing 'pc', or None."""
+        entry = self.__lookup(self.__decode()[2], pc)
+        return (entry[1], self.__origin(pc) - entry[0]) if entry else None
+
+    def describe(self, pc):
+        """Describe the source location of 'pc', or return None."""
+        if not self.data:
+            return None
+        parts = []
+        location = self.location(pc)
+        if location:
+            parts.append(f"{location[0]}:{location[1]}")
+        symbol = self.symbol(pc)
+        if symbol:
+            name, offset = symbol
+            parts.append(f"{name}+{offset}" if offset else name)
+        return ", ".join(parts) or None
+
+    def __origin(self, pc):
+        if self.origins is not None and 0 <= pc < len(self.origins):
+            return self.origins[pc]
+        return pc
+
+    def __lookup(self, entries, pc):
+        """Find the last entry starting at or before pc."""
+        index = bisect_right(
+            entries, self.__origin(pc), key=lambda entry: entry[0]
+        )
+        return entries[index - 1] if index > 0 else None
+
+    def __decode(self):
+        if self.__records is None:
+            self.__records = DebugInfo.parse(self.data)
+        return self.__records
+
+    @staticmethod
+    def parse(data):
+        """Parse debug records, returning (data_symbols, lines, symbols)."""
+        data_symbols = []
+        lines = []
+        symbols = []
+        filename = None
+        offset = 0
+        while offset < len(data):
+            record = data[offset : offset + 1]
+            offset += 1
+            match record:
+                case b"i" | b"d" | b"s":
+                    name, size = DataTranslator.unpack_string(data, offset)
+                    data_symbols.append((name, record.decode("utf-8")))
+                case b"F":
+                    filename, size = DataTranslator.unpack_string(data, offset)
+                case b"L":
+                    pc, line = struct.unpack_from("<QQ", data, offset)
+                    lines.append((pc, filename, line))
+                    size = 16
+                case b"S":
+                    (pc,) = UINT64.unpack_from(data, offset)
+                    name, size = DataTranslator.unpack_string(data, offset + 8)
+                    symbols.append((pc, name))
+                    size += 8
+                case _:  # pragma: no cover
+                    raise InvalidLogoFile(f"Invalid debug record: {record!r}")
+            offset += size
+        lines.sort(key=lambda entry: entry[0])
+        symbols.sort(key=lambda entry: entry[0])
+        return data_symbols, lines, symbols
+
+
+class LazyCode(Sequence):
+    """
+    Program code decoded on demand.
+
+    Instructions are decoded from the program buffer on first access,
+    and cached. The table of instruction offsets, relative to the start
+    of the code, is read from the program '.CIDX' section, if available,
+    or built with a single scan of the code. Fixed width instructions
+    do not need an offset table.
+    """
+
+    def __init__(self, buffer, start, end, offsets=None, pool=None):
+        """
+        Initialize code from buffer[start:end].
+
+        If a string 'pool' is given, instructions are fixed width
+        records, as in format version 0.3.
+        """
+        self.buffer = buffer
+        self.view = memoryview(buffer)
+        self.pool = pool
+        self.start = start
+        if offsets is None:
+            offsets = LazyCode.scan(buffer, start, end)
+        self.offsets = offsets
+        self.decoded = [None] * len(offsets)
+
+    def __len__(self):
+        """Return the number of instructions."""
+        return len(self.offsets)
+
+    def __getitem__(self, pc):
+        """Retrieve the instruction at 'pc'."""
+        if isinstance(pc, slice):
+            return [self[index] for index in range(*pc.indices(len(self)))]
+        instruction = self.decoded[pc]
+        if instruction is None:
+            instruction = self.__decode(self.start + self.offsets[pc])
+            self.decoded[pc] = instruction
+        return instruction
+
+    def __decode(self, offset):
+        buffer = self.buffer
+        if self.pool is not None:
+            return self.__decode_record(*RECORD.unpack_from(buffer, offset))
+        cmd = buffer[offset]
+        if cmd < 128:  # no args
+            return NO_ARGS[cmd]
+        if cmd < 224:  # UINT/ADDR, INT or DOUBLE arg
+            return (cmd, ARGUMENTS[cmd >> 5](buffer, offset + 1)[0])
+        stop = buffer.find(b"\0", offset + 1)
+        if stop < 0:  # pragma: no cover
+            raise InvalidLogoFile("Unterminated String data.")
+        return (cmd, str(self.view[offset + 1 : stop], "utf-8"))
+
+    def __decode_record(self, cmd, arg):
+        if cmd < 128:  # no args
+            return NO_ARGS[cmd]
+        if cmd < 160:  # UINT/ADDR arg
+            return (cmd, arg & 0xFFFFFFFFFFFFFFFF)
+        if cmd < 192:  # INT arg
+            return (cmd, arg)
+        if cmd < 224:  # DOUBLE arg
+            return (cmd, DOUBLE.unpack(INT64.pack(arg))[0])
+        return (cmd, self.pool[arg])
+
+    @staticmethod
+    def scan(buffer, start, end):
+        """Build the table of instruction offsets, relative to 'start'."""
+        offsets = array("Q")
+        append = offsets.append
+        find = buffer.find
+        offset = start
+        while offset < end:
+            append(offset - start)
+            cmd = buffer[offset]
+            if cmd < 128:  # no args
+                offset += 1
+            elif cmd < 224:  # UINT/ADDR, INT or DOUBLE arg
+                offset += 9
+            else:  # STRING arg
+                offset = find(b"\0", offset + 1, end) + 1
+                if offset == 0:  # pragma: no cover
+                    raise InvalidLogoFile("Unterminated String data.")
+        if offset != end:  # pragma: no cover
+            raise InvalidLogoFile("Invalid code section size.")
+        return offsets
+
+
+class PackedCode(Sequence):
+    """
+    Program code stored in parallel arrays.
+
+    Opcodes are stored in an array of bytes, and operands in an array
+    of 64-bit integers, with the same index. UINT/ADDR and INT operands
+    are stored as integers, DOUBLE operands as indexes in an array of
+    doubles, and STRING operands as indexes in a table of unique
+    strings. Instruction tuples are only built when accessed. Only the
+    instructions of the program file format can be stored, so code with
+    superinstructions must be kept as a list.
+    """
+
+    def __init__(self, instructions=()):
+        """Initialize packed code with the given instructions."""
+        self.opcodes = array("B")
+        self.operands = array("q")
+        self.doubles = array("d")
+        self.strings = []
+        self.__string_index = {}
+        for instruction in instructions:
+            self.append(instruction)
+
+    def __len__(self):
+        """Return the number of instructions."""
+        return len(self.opcodes)
+
+    def __getitem__(self, pc):
+        """Retrieve the instruction at 'pc'."""
+        if isinstance(pc, slice):
+            return [self[index] for index in range(*pc.indices(len(self)))]
+        cmd = self.opcodes[pc]
+        if cmd < 128:  # no args
+            return NO_ARGS[cmd]
+        return (cmd, self.argument(cmd, self.operands[pc]))
+
+    def argument(self, cmd, operand):
+        """Retrieve the argument of 'cmd' from its stored operand."""
+        if cmd < 160:  # UINT/ADDR arg
+            return operand & 0xFFFFFFFFFFFFFFFF
+        if cmd < 192:  # INT arg
+            return operand
+        if cmd < 224:  # DOUBLE arg
+            return self.doubles[operand]
+        return self.strings[operand]  # STRING arg
+
+    def append(self, instruction):
+        """Add an instruction to the end of the code."""
+        cmd = instruction[0]
+        if cmd < 128:  # no args
+            operand = 0
+        elif cmd < 160:  # UINT/ADDR arg, stored as INT
+            operand = instruction[1]
+            if operand > 0x7FFFFFFFFFFFFFFF:
+                operand -= 0x10000000000000000
+        elif cmd < 192:  # INT arg
+            operand = instruction[1]
+        elif cmd < 224:  # DOUBLE arg
+            operand = len(self.doubles)
+            self.doubles.append(instruction[1])
+        else:  # STRING arg
+            operand = self.__string_index.get(instruction[1])
+            if operand is None:
+                operand = len(self.strings)
+                self.__string_index[instruction[1]] = operand
+                self.strings.append(instruction[1])
+        self.opcodes.append(cmd)
+        self.operands.append(operand)
+
+
 class LogoVMLoader:
     """Methods to parse LogoVM executable files."""
 
     @staticmethod
-    def load_program(inputstream, min_version):
-        """Load program data from stream."""
-        with BytesIO(inputstream.read()) as datastream:
-            LogoVMLoader.__load_header(datastream, min_version)
-            vm_extension = LogoVMLoader.__load_extension(datastream)
+    def load_program(inputstream, min_version, lazy=False, packed=False):
+        """
+        Load program data from stream.
+
+        If 'lazy' is set, code is returned as a LazyCode object, and
+        instructions are only decoded when used. Otherwise, if 'packed'
+        is set, code is returned as a PackedCode object.
+        """
+        try:
+            fileno = inputstream.fileno()
+        except (AttributeError, OSError):  # not a real file, e.g. BytesIO
+            return LogoVMLoader.load_buffer(
+                inputstream.read(), min_version, lazy, packed
+            )
+        try:
+            mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        except ValueError:  # pragma: no cover
+            raise InvalidLogoFile("Empty program file.") from None
+        except OSError:  # cannot be mapped, e.g. a pipe
+            return LogoVMLoader.load_buffer(
+                inputstream.read(), min_version, lazy, packed
+            )
+        if lazy:
+            # the map is kept open while code is in use.
+            return LogoVMLoader.load_buffer(mapped, min_version, lazy)
+        with mapped:
+            return LogoVMLoader.load_buffer(mapped, min_version, packed=packed)
+
+    @staticmethod
+    def load_buffer(buffer, min_version, lazy=False, packed=False):
+        """
+        Load program data from a bytes-like object, e.g. an mmap.
+
+        Values are decoded directly from the buffer, at their offsets,
+        and, unless 'lazy' is set, no reference to the buffer is kept
+        after loading. Compressed sections are decompressed one at a
+        time, and decoded from the decompressed data.
+        """
+        with memoryview(buffer) as view:
+            offset, version = LogoVMLoader.__load_header(buffer, min_version)
+            vm_extension, offset = LogoVMLoader.__load_extension(view, offset)
+            # read '.pool' data, since version 0.3
+            pool = None
+            if version >= RECORDS_VERSION:
+                section, offset = LogoVMLoader.__section(
+                    buffer, view, offset, b".POOL"
+                )
+                pool = LogoVMLoader.__load_pool(*section) if section else []
             # read '.code' data
-            if not LogoVMLoader.check_mark(datastream, ".CODE", "Code mark"):
+            code, offset = LogoVMLoader.__section(
+                buffer, view, offset, b".CODE"
+            )
+            if code is None:
                 raise InvalidLogoFile("No .CODE section.")  # pragma: no cover
-            code = LogoVMLoader.__load_code(datastream)
+            if pool is not None:
+                code = LogoVMLoader.__load_records(
+                    *code, pool, lazy=lazy, packed=packed
+                )
+            else:
+                # read '.cidx' data, if available
+                index, offset = LogoVMLoader.__section(
+                    buffer, view, offset, b".CIDX"
+                )
+                code = LogoVMLoader.__load_code(
+                    *code, index, lazy=lazy, packed=packed
+                )
             # read '.data' data
-            data = LogoVMLoader.__load_data(datastream)
+            data, offset = LogoVMLoader.__section(
+                buffer, view, offset, b".DATA"
+            )
+            data = LogoVMLoader.__load_data(*data) if data else []
             # read '.debg' data, if available
-            debug = LogoVMLoader.__load_debug(datastream)
+            debug, offset = LogoVMLoader.__section(
+                buffer, view, offset, b".DBUG"
+            )
+            # records are decoded only when needed.
+            debug = DebugInfo(LogoVMLoader.__bytes(*debug) if debug else b"")
             # check if all data was read.
-            if datastream.read(1):  # pragma: no cover
+            if offset != len(buffer):  # pragma: no cover
                 raise InvalidLogoFile("Extra data on file.")
-        #
         return vm_extension, code, data, debug
 
     @staticmethod
@@ -141,88 +515,203 @@ class LogoVMLoader:
         return not (major > vmajor or (major == vmajor and minor > vminor))
 
     @staticmethod
-    def __load_header(datastream, check_version):
+    def __section(buffer, view, offset, mark):
+        """
+        Find section 'mark' at offset.
+
+        Return ((data, start, end), next offset), or (None, offset) if
+        the section is not present. For compressed sections, 'data' is
+        the decompressed section content.
+        """
+        head = bytes(buffer[offset : offset + 10])
+        if head[:5] == mark:
+            size, _ = DataTranslator.unpack_number(buffer, offset + 5, "Q")
+            start = offset + 13
+            if start + size > len(buffer):  # pragma: no cover
+                raise InvalidLogoFile(f"Truncated {mark.decode()} section.")
+            return (buffer, start, start + size), start + size
+        if head == b".ZSEC" + mark:
+            method = buffer[offset + 10]
+            size, data_size = COMPRESSED.unpack_from(buffer, offset + 11)
+            start = offset + 11 + COMPRESSED.size
+            if start + size > len(buffer):  # pragma: no cover
+                raise InvalidLogoFile(f"Truncated {mark.decode()} section.")
+            data = LogoVMLoader.__decompress(
+                view[start : start + size], method, data_size
+            )
+            return (data, 0, data_size), start + size
+        return None, offset
+
+    @staticmethod
+    def __decompress(view, method, size):
+        """Decompress a section, in chunks, to a buffer of 'size' bytes."""
+        decompressor = LogoVMLoader.__decompressor(method)
+        if size > len(view) * MAX_RATIO:
+            raise InvalidLogoFile("Invalid compressed section size.")
+        try:
+            data = bytearray(size)
+        except (MemoryError, OverflowError):  # pragma: no cover
+            raise InvalidLogoFile("Invalid compressed section size.") from None
+        position = 0
+        try:
+            for chunk in range(0, len(view), CHUNK_SIZE):
+                pending = view[chunk : chunk + CHUNK_SIZE]
+                while pending is not None:
+                    # one extra byte of output detects overlong data.
+                    output = decompressor.decompress(
+                        pending, size - position + 1
+                    )
+                    if len(output) > size - position:
+                        raise InvalidLogoFile(
+                            "Invalid compressed section size."
+                        )
+                    data[position : position + len(output)] = output
+                    position += len(output)
+                    pending = LogoVMLoader.__pending(decompressor)
+        except (zlib.error, lzma.LZMAError, EOFError) as error:
+            message = f"Invalid compressed data: {error}"
+            raise InvalidLogoFile(message) from None
+        if position != size or decompressor.unused_data:
+            raise InvalidLogoFile("Invalid compressed section size.")
+        return data
+
+    @staticmethod
+    def __decompressor(method):
+        """Create a decompressor for the section compression method."""
+        if method == ZLIB:
+            return zlib.decompressobj()
+        if method == LZMA:
+            return lzma.LZMADecompressor()
+        raise InvalidLogoFile(  # pragma: no cover
+            f"Invalid compression method: {method}"
+        )
+
+    @staticmethod
+    def __pending(decompressor):
+        """Retrieve input to continue decompression, None if it is done."""
+        if isinstance(decompressor, lzma.LZMADecompressor):
+            if decompressor.needs_input or decompressor.eof:
+                return None
+            return b""  # output is buffered by the decompressor
+        return decompressor.unconsumed_tail or None
+
+    @staticmethod
+    def __bytes(buffer, start, end):
+        return bytes(buffer[start:end])
+
+    @staticmethod
+    def __load_header(buffer, check_version):
         # magic
-        LogoVMLoader.check_mark(datastream, "LOGO", "Magic")
+        if bytes(buffer[:4]) != b"LOGO":
+            raise InvalidLogoFile("Magic did not match.")  # pragma: no cover
         # machine header
-        records = [
-            ("version_major", "B"),
-            ("version_minor", "B"),
-        ]
-        header = DataTranslator.parse_data(datastream.read(2), records)
-        # version
-        version = {header["version_major"], header["version_minor"]}
-        if not LogoVMLoader.check_version(version, check_version):
+        version = tuple(buffer[4:6])
+        if len(version) != 2 or not LogoVMLoader.check_version(
+            version, check_version
+        ):
             raise (  # pragma: no cover
                 InvalidLogoFile(f"Cannot provide version: {version}")
             )
+        return 6, version
 
     @staticmethod
-    def __load_extension(datastream):
-        header = DataTranslator.parse_data(
-            datastream.read(2), [("ext_size", "H")]
-        )
-        logging.debug("LogoVM: Extension header size: %d", header["ext_size"])
-        return (
-            datastream.read(header["ext_size"])
-            if header["ext_size"] > 0
-            else None
-        )
+    def __load_extension(view, offset):
+        ext_size, size = DataTranslator.unpack_number(view, offset, "H")
+        logging.debug("LogoVM: Extension header size: %d", ext_size)
+        offset += size
+        if ext_size == 0:
+            return None, offset
+        return bytes(view[offset : offset + ext_size]), offset + ext_size
 
     @staticmethod
-    def __load_code(datastream):
-        code_sz, _ = DataTranslator.read_number(datastream, "Q")
-        code = []
-        while code_sz > 0:
-            cmd = datastream.read(1)[0]
-            bread = 0
-            data_type = None
-            match cmd:
-                case cmd if cmd < 128:  # no args
-                    arg = None
-                case cmd if cmd < 160:  # UINT/ADDR arg
-                    data_type = "Q"
-                case cmd if cmd < 192:  # INT arg
-                    data_type = "q"
-                case cmd if cmd < 224:  # DOUBLE arg
-                    data_type = "d"  # pragma: no cover
-                case _:  # STRING arg
-                    arg, bread = DataTranslator.read_string(datastream)
-            if data_type:
-                arg, bread = DataTranslator.read_number(datastream, data_type)
-            code.append((cmd, arg) if arg is not None else (cmd,))
-            code_sz -= 1 + bread
+    def __load_code(
+        buffer, offset, end, index, *, lazy, packed
+    ):  # pylint: disable=too-many-arguments
+        if lazy:
+            if index is not None:
+                index = array("Q", LogoVMLoader.__bytes(*index))
+                if sys.byteorder == "big":  # pragma: no cover
+                    index.byteswap()
+            return LazyCode(buffer, offset, end, index)
+        code = PackedCode() if packed else []
+        append = code.append
+        find = buffer.find
+        arguments = ARGUMENTS
+        no_args = NO_ARGS
+        with memoryview(buffer) as view:
+            while offset < end:
+                cmd = buffer[offset]
+                offset += 1
+                if cmd < 128:  # no args
+                    append(no_args[cmd])
+                elif cmd < 224:  # UINT/ADDR, INT or DOUBLE arg
+                    append((cmd, arguments[cmd >> 5](buffer, offset)[0]))
+                    offset += 8
+                else:  # STRING arg
+                    stop = find(b"\0", offset, end)
+                    if stop < 0:  # pragma: no cover
+                        raise InvalidLogoFile("Unterminated String data.")
+                    append((cmd, str(view[offset:stop], "utf-8")))
+                    offset = stop + 1
+        if offset != end:  # pragma: no cover
+            raise InvalidLogoFile("Invalid code section size.")
         return code
 
     @staticmethod
-    def __load_data(datastream):
-        if not LogoVMLoader.check_mark(datastream, ".DATA", "Data mark"):
-            return []
-        data_sz, _ = DataTranslator.read_number(datastream, "Q")
+    def __load_pool(buffer, start, end):
+        pool = str(buffer[start:end], "utf-8").split("\0")
+        if pool.pop() != "":  # pragma: no cover
+            raise InvalidLogoFile("Unterminated String data.")
+        return pool
+
+    @staticmethod
+    def __load_records(
+        buffer, start, end, pool, *, lazy, packed
+    ):  # pylint: disable=too-many-arguments
+        if (end - start) % RECORD.size:  # pragma: no cover
+            raise InvalidLogoFile("Invalid code section size.")
+        if lazy:
+            offsets = range(0, end - start, RECORD.size)
+            return LazyCode(buffer, start, end, offsets, pool)
+        code = PackedCode() if packed else []
+        append = code.append
+        no_args = NO_ARGS
+        try:
+            with memoryview(buffer) as view:
+                for cmd, arg in RECORD.iter_unpack(view[start:end]):
+                    if cmd < 128:  # no args
+                        append(no_args[cmd])
+                    elif cmd < 160:  # UINT/ADDR arg
+                        append((cmd, arg & 0xFFFFFFFFFFFFFFFF))
+                    elif cmd < 192:  # INT arg
+                        append((cmd, arg))
+                    elif cmd < 224:  # DOUBLE arg
+                        append((cmd, DOUBLE.unpack(INT64.pack(arg))[0]))
+                    else:  # STRING arg
+                        append((cmd, pool[arg]))
+        except IndexError:  # pragma: no cover
+            raise InvalidLogoFile("Invalid string pool index.") from None
+        return code
+
+    @staticmethod
+    def __load_data(buffer, offset, end):
         data = []
-        while data_sz > 0:
-            data_type = datastream.read(1)
-            bread = 8
+        while offset < end:
+            data_type = buffer[offset : offset + 1]
+            offset += 1
             match data_type:
-                case dtype if dtype in [b"i", b"d"]:  # pylint: disable=E0601
-                    data.append(
-                        DataTranslator.read_number(datastream, data_type)[0]
-                    )
+                case b"i":  # 64-bit integer
+                    data.append(INT64.unpack_from(buffer, offset)[0])
+                    offset += 8
+                case b"d":  # 64-bit float
+                    data.append(DOUBLE.unpack_from(buffer, offset)[0])
+                    offset += 8
                 case b"s":  # string
-                    string, bread = DataTranslator.read_string(datastream)
+                    string, size = DataTranslator.unpack_string(
+                        buffer, offset, end
+                    )
                     data.append(string)
+                    offset += size
                 case _:  # pragma: no cover
-                    raise InvalidLogoFile(
-                        f"Invalid data type: {data_type.encode('utf-8')}"
-                    )
-            data_sz -= 1 + bread
+                    raise InvalidLogoFile(f"Invalid data type: {data_type!r}")
         return data
-
-    @staticmethod
-    def __load_debug(datastream):
-        if not LogoVMLoader.check_mark(datastream, ".DBUG", "Debug mark"):
-            return []
-        debug_sz, _ = DataTranslator.read_number(datastream, "Q")
-        # TODO: load debug data
-        datastream.seek(debug_sz, 1)
-        return []
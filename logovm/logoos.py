@@ -21,7 +21,8 @@ import logging
 
 from logovm import register_extension
 from logovm.loader import DataTranslator
-from logovm.errors import InvalidOS
+from logovm.errors import InvalidOS, LogoVMSuspend
+from logovm.verifier import COUNTED
 
 
 class LogoOS:  # pylint: disable=too-few-public-methods
@@ -47,26 +48,35 @@ class LogoOS:  # pylint: disable=too-few-public-methods
             self.ready = True
 
     def __set_interrupts(self, logo_vm):
-        logo_vm.set_interrupt(0, lambda _: None)  # Shutdown
+        logo_vm.set_interrupt(0, lambda _: None, ((), ()))  # Shutdown
         logo_vm.set_interrupt(
             1,  # WRITE
-            lambda machine: (
-                print(
-                    "".join(
-                        [str(machine.pop()) for y in range(machine.pop())][
-                            ::-1
-                        ]
-                    ),
-                    end="",
-                    file=machine.console[1],
-                ),
+            lambda machine: machine.console[1].write(
+                "".join(map(str, machine.pop_n(machine.pop())))
             ),
+            COUNTED,
         )
         logo_vm.set_interrupt(
             2,  # READ
-            lambda machine: machine.push(DataTranslator.autoconvert(input())),
+            LogoOS.__read,
+            ((), (None,)),
         )
 
+    @staticmethod
+    def __read(machine):
+        """
+        Read a line from the machine console input.
+
+        If the input stream has no line available yet, and returns None,
+        execution is suspended until it is resumed by a scheduler.
+        """
+        line = machine.console[0].readline()
+        if line is None:
+            raise LogoVMSuspend("input", LogoOS.__read)
+        if not line:
+            raise EOFError("EOF when reading a line")
+        machine.push(DataTranslator.autoconvert(line.rstrip("\n")))
+
     # def __decode_init(self, logo_vm, header_data):
     #    with io.BytesIO(header_data) as infile:
     #        check_header_mark(infile, "LogoOS", "OS Name")
@@ -21,21 +21,114 @@ import logging
 
 import sys
 import operator
-from random import random
+from functools import partial
+from random import Random
+
+from logovm.errors import (
+    LogoVMError,
+    LogoVMInvalidAccess,
+    LogoVMEmptyStack,
+    LogoVMStackOverflow,
+    LogoVMSuspend,
+    ExtensionError,
+    VerificationError,
+)
+from logovm.verifier import BytecodeVerifier
+from logovm.specializer import AdaptiveSpecializer
+from logovm.heap import CompactHeap
+from logovm.loader import LazyCode, PackedCode
+from logovm.rope import STRING_TYPES, concat, substring
+
+
+class LogoStack:
+    """Fixed capacity operand stack, with an explicit stack pointer."""
+
+    __slots__ = ("data", "sp", "capacity")
+
+    def __init__(self, capacity):
+        """Initialize stack with a fixed capacity."""
+        self.data = [None] * capacity
+        self.sp = 0
+        self.capacity = capacity
+
+    def __len__(self):
+        """Return the number of values in the stack."""
+        return self.sp
 
-from logovm.errors import LogoVMError, ExtensionError
+    def push(self, value):
+        """Push value onto the stack."""
+        sp = self.sp
+        if sp >= self.capacity:  # pragma: no cover
+            raise LogoVMStackOverflow("Stack overflow")
+        self.data[sp] = value
+        self.sp = sp + 1
 
+    def pop(self):
+        """Pop value from the stack."""
+        sp = self.sp - 1
+        if sp < 0:  # pragma: no cover
+            raise LogoVMEmptyStack("Empty stack")
+        self.sp = sp
+        return self.data[sp]
 
-class LogoVMInvalidAccess(LogoVMError):
-    """Invalid data access."""
+    def push_unchecked(self, value):
+        """Push value onto the stack, without checking its capacity."""
+        sp = self.sp
+        self.data[sp] = value
+        self.sp = sp + 1
 
+    def pop_unchecked(self):
+        """Pop value from the stack, without checking if it is empty."""
+        sp = self.sp - 1
+        self.sp = sp
+        return self.data[sp]
 
-class LogoVMEmptyStack(LogoVMInvalidAccess):
-    """Stack underflow error."""
+    def peek(self):
+        """Check the value on the top of the stack, without removing it."""
+        if self.sp <= 0:  # pragma: no cover
+            raise LogoVMEmptyStack("Empty stack")
+        return self.data[self.sp - 1]
 
+    def peek_n(self, count):
+        """Retrieve the 'count' values on top of the stack, bottom first."""
+        if not 0 <= count <= self.sp:  # pragma: no cover
+            raise LogoVMEmptyStack("Empty stack")
+        return self.data[self.sp - count : self.sp]
+
+    def pop_n(self, count):
+        """Pop 'count' values from the stack, returning the bottom first."""
+        values = self.peek_n(count)
+        self.sp -= count
+        return values
+
+    def push_many(self, values):
+        """Push values onto the stack, the last one on top."""
+        values = list(values)
+        sp = self.sp
+        top = sp + len(values)
+        if top > self.capacity:  # pragma: no cover
+            raise LogoVMStackOverflow("Stack overflow")
+        self.data[sp:top] = values
+        self.sp = top
+
+    def dup(self):
+        """Duplicate the value on top of the stack, returning it."""
+        value = self.peek()
+        self.push(value)
+        return value
+
+    def swap(self):
+        """Swap the two values on top of the stack, returning the new top."""
+        if self.sp < 2:  # pragma: no cover
+            raise LogoVMEmptyStack("Empty stack")
+        data, top = self.data, self.sp - 1
+        data[top], data[top - 1] = data[top - 1], data[top]
+        return data[top]
 
-class LogoVMStackOverflow(LogoVMError):
-    """Stack overflow error."""
+    def clear(self):
+        """Remove all values from the stack."""
+        self.data[: self.sp] = [None] * self.sp
+        self.sp = 0
 
 
 class LogoMemory:
@@ -44,43 +137,63 @@ class LogoMemory:
     def __init__(self, maxstack=2**14):
         """Initialize object with a maximum stack size."""
         self.heap = []
-        self.stack = []
+        self.stack = LogoStack(maxstack)
         self.maxstack = maxstack
         self.debug = []
+        self.set_checked(True)
 
-    def get_heap(self, addr):  # pragma: no cover
-        """Retrieve data from the heap."""
+    def checked_get_heap(self, addr):  # pragma: no cover
+        """Retrieve data from the heap, checking the address."""
         if not 0 <= addr < len(self.heap):
             raise LogoVMInvalidAccess(f"Invalid heap address: {addr}")
         return self.heap[addr]
 
-    def set_heap(self, addr, value):  # pragma: no cover
-        """Set data on the heap."""
+    def checked_set_heap(self, addr, value):  # pragma: no cover
+        """Set data on the heap, checking the address."""
         if not 0 <= addr < len(self.heap):
             raise LogoVMInvalidAccess(f"Invalid heap address: {addr}")
         self.heap[addr] = value
 
     def peek(self):
         """Check the value on the top of the stack, without removing it."""
-        return self.stack[-1]
-
-    def pop(self):
-        """Pop value from the stack."""
-        if not self.stack:  # pragma: no cover
-            raise LogoVMEmptyStack("Empty stack")
-        return self.stack.pop()
-
-    def push(self, value):
-        """Push value onto the stack."""
-        if len(self.stack) - 1 >= self.maxstack:  # pragma: no cover
-            raise LogoVMStackOverflow("Stack overflow")
-        self.stack.append(value)
+        return self.stack.peek()
 
+    def set_checked(self, checked):
+        """
+        Enable or disable stack and heap bounds checks.
 
+        The 'push', 'pop', 'get_heap' and 'set_heap' attributes are bound
+        to the stack and heap operations, with or without checks.
+        """
+        if checked:
+            self.push = self.stack.push
+            self.pop = self.stack.pop
+            self.get_heap = self.checked_get_heap
+            self.set_heap = self.checked_set_heap
+        else:
+            self.push = self.stack.push_unchecked
+            self.pop = self.stack.pop_unchecked
+            self.get_heap = self.heap.__getitem__
+            self.set_heap = self.heap.__setitem__
+
+
+# Extensions use the machine API and state directly (stack, registers,
+# flags, interrupts, execution control), so it is kept in one class.
+# pylint: disable-next=too-many-public-methods,too-many-instance-attributes
 class LogoVM:
     """Implements a stack machine to run Logo-like programs.."""
 
-    __version__ = (0, 2)
+    __version__ = (0, 3)
+
+    ENGINES = ("threaded", "adaptive", "table", "compiled", "reference")
+
+    TRACE_EVENTS = (
+        "instruction",
+        "interrupt",
+        "interrupt_exit",
+        "call",
+        "return",
+    )
 
     def __init__(self, **options):
         """
@@ -89,28 +202,129 @@ class LogoVM:
         Available options:
 
             maxstack: Maximum stack size. (Default to 2**14)
+            engine: Execution engine, one of ENGINES. (Default to "threaded")
+            heap: Heap storage, "list" or "compact". (Default to "list")
             stdin: Standard input stream.
             stdout: Standard output stream.
             stderr: Standard error stream.
+            seed: Seed for the random number generator. (Default to None)
+
+        Machine state, including I/O streams and the random number
+        generator, is kept per instance, so different machines can be
+        executed concurrently, in different threads.
         """
         self.regs = [0] * 8
         self.flags = 0
         self.code = []
         self.intr = [lambda logo_vm: None] * 16
+        self.intr_effects = [((), ())] * 16
         self.callstack = []
         self.mem = LogoMemory(maxstack=options.get("maxstack", 2**14))
         self.running = False
+        self.random = Random(options.get("seed"))
         self.console = (
             options.get("stdin", sys.stdin),
             options.get("stdout", sys.stdout),
             options.get("stderr", sys.stderr),
         )
+        engine = options.get("engine", "threaded")
+        if engine not in self.ENGINES:
+            raise LogoVMError(f"Invalid engine: {engine}")
+        self.engine = engine
+        self.heap_backend = options.get("heap", "list")
+        if self.heap_backend not in ("list", "compact"):
+            raise LogoVMError(f"Invalid heap storage: {self.heap_backend}")
+        self.__ops = self.__build_ops()
+        self.__threaded = []
+        self.__compiler = None
+        self.__trace = {event: [] for event in self.TRACE_EVENTS}
+        self.__reset_hooks = []
+        self.__pending = None
+        self.__initial_heap = ()
+        self.__initial_console = self.console
+        self.verification = None
+        self.instructions = 0
+        self.__set_type_checked(True)
 
     def setup(self, code, data=None, debug=None):
         """Set VM with code, data and debug records."""
         self.code = code
+        if data is None:  # program without a data section
+            data = []
+        self.__initial_heap = tuple(data)
+        self.__initial_console = self.console
+        if self.heap_backend == "compact":
+            data = CompactHeap(data)
         self.mem.heap = data
         self.mem.debug = debug
+        self.mem.set_checked(True)
+        self.__set_type_checked(True)
+        self.verification = None
+        if self.engine == "threaded" and isinstance(
+            code, (LazyCode, PackedCode)
+        ):
+            # instructions are threaded when first executed.
+            self.__threaded = [self.__thread_lazy] * len(code)
+        elif self.engine in ("threaded", "adaptive"):
+            self.__threaded = self.__thread_code(code)
+        if self.engine == "adaptive":
+            AdaptiveSpecializer(self, self.__threaded).install()
+        elif self.engine == "compiled":
+            # pylint: disable=import-outside-toplevel
+            from logovm.compiler import BlockCompiler
+
+            self.__compiler = BlockCompiler(self)
+
+    def reset(self):
+        """
+        Reset the machine to its state after setup, keeping the code.
+
+        The heap is restored in place, from its initial values, so the
+        operations bound to it remain valid. The whole heap is copied,
+        as stores are not tracked, so reset is O(heap) but avoids
+        allocating a new machine. Console streams given to
+        execute() are discarded. Extension state is restored by the
+        hooks added with add_reset_hook.
+        """
+        heap = self.mem.heap
+        if isinstance(heap, list):
+            heap[:] = self.__initial_heap
+        else:
+            for addr, value in enumerate(self.__initial_heap):
+                heap[addr] = value
+        self.mem.stack.clear()
+        self.callstack.clear()
+        self.regs[:] = [0] * len(self.regs)
+        self.flags = 0
+        self.running = False
+        self.console = self.__initial_console
+        for hook in self.__reset_hooks:
+            hook(self)
+
+    def add_reset_hook(self, hook):
+        """Add a hook called as hook(logo_vm) when the machine is reset."""
+        self.__reset_hooks.append(hook)
+
+    def __thread_code(self, code):
+        """Convert instructions to callables with bound arguments."""
+        return [self.__thread_instruction(instruction) for instruction in code]
+
+    def __thread_instruction(self, instruction):
+        cmd, *args = instruction
+        ops = self.__ops.get(cmd)
+        if ops is None:  # pragma: no cover
+            return partial(self.__invalid_command, cmd)
+        return partial(ops, *args) if args else ops
+
+    def __thread_lazy(self):
+        """Thread the instruction at PC, and execute it."""
+        pc = self.regs[-1]
+        ops = self.__threaded[pc] = self.__thread_instruction(self.code[pc])
+        ops()
+
+    @staticmethod
+    def __invalid_command(cmd):  # pragma: no cover
+        raise LogoVMError(f"Invalid command: {cmd}")
 
     @staticmethod
     def __check_type(values, type_list):
@@ -129,11 +343,71 @@ class LogoVM:
         """Push a value to the machine stack."""
         self.mem.push(value)
 
-    def pop_type(self, type_list):
+    def __pop_type_checked(self, type_list):
         """Pop a value with a specific type from machine stack."""
         self.__check_type(self.mem.peek(), type_list)
         return self.pop()
 
+    def __pop_type_unchecked(self, _type_list):
+        return self.pop()
+
+    def pop_n(self, count):
+        """Pop 'count' values from the machine stack, bottom first."""
+        values = self.mem.stack.pop_n(count)
+        if values:
+            self.regs[1] = values[0]
+        return values
+
+    def push_many(self, values):
+        """Push values to the machine stack, the last one on top."""
+        self.mem.stack.push_many(values)
+
+    def __pop_n_type_checked(self, count, type_list):
+        """Pop 'count' values with a specific type, bottom first."""
+        self.__check_type(self.mem.stack.peek_n(count), type_list)
+        return self.pop_n(count)
+
+    def __pop_n_type_unchecked(self, count, _type_list):
+        return self.pop_n(count)
+
+    def __set_type_checked(self, checked):
+        """
+        Enable or disable operand type checks.
+
+        The 'pop_type' and 'pop_n_type' attributes are bound to the
+        operations that pop values of specific types, with or without
+        checks.
+        """
+        if checked:
+            self.pop_type = self.__pop_type_checked
+            self.pop_n_type = self.__pop_n_type_checked
+        else:
+            self.pop_type = self.__pop_type_unchecked
+            self.pop_n_type = self.__pop_n_type_unchecked
+
+    def verify(self, strict=False):
+        """
+        Verify the loaded program, using the configured interrupts.
+
+        Programs with proven stack depth and heap accesses run without
+        bounds checks, and, if operand types are also proven, without
+        type checks. A program that fails verification raises
+        VerificationError if 'strict' is set, otherwise it runs with
+        all checks enabled.
+        """
+        result = BytecodeVerifier(
+            self.code, self.mem.heap, self.intr_effects, self.mem.maxstack
+        ).verify()
+        logging.debug("LogoVM: Verification: %s", repr(result))
+        if not result.valid and strict:
+            raise VerificationError(result.reason)
+        if result.proven:
+            self.mem.set_checked(False)
+        if result.typed:
+            self.__set_type_checked(False)
+        self.verification = result
+        return result
+
     def set_flag(self, flag):
         """Set flag."""
         self.flags |= 1 << flag
@@ -161,30 +435,16 @@ class LogoVM:
         else:  # ==
             self.regs[0] = 0
 
-    def __binop(self, oper):
-        operation = {
-            "+": operator.add,
-            "-": operator.sub,
-            "*": operator.mul,
-            "/": operator.truediv,
-            "**": operator.pow,
-        }
+    def __binop(self, operation):
         self.regs[2] = self.pop_type((int, float))  # rhs
         self.regs[1] = self.pop_type((int, float))  # lhs
-        self.regs[1] = operation[oper](self.regs[1], self.regs[2])
+        self.regs[1] = operation(self.regs[1], self.regs[2])
         self.push(self.regs[1])
 
-    def __bitop(self, oper):  # pragma: no cover
-        operation = {
-            "&": operator.and_,
-            "|": operator.or_,
-            "^": operator.xor,
-            "<<": operator.lshift,
-            ">>": operator.rshift,
-        }
+    def __bitop(self, operation):  # pragma: no cover
         self.regs[2] = self.pop_type(int)  # rhs
         self.regs[1] = self.pop_type(int)  # lhs
-        self.regs[1] = operation[oper](self.regs[1], self.regs[2])
+        self.regs[1] = operation(self.regs[1], self.regs[2])
         self.push(self.regs[1])
 
     def __idiv(self):  # pragma: no cover
@@ -206,21 +466,22 @@ class LogoVM:
         self.push(self.regs[1])
 
     def __cat(self):  # pragma: no cover
-        self.regs[2] = self.pop_type(str)  # lhs
-        self.regs[1] = self.pop_type(str)  # rhs
-        self.regs[1] = f"{self.regs[1]}{self.regs[2]}"
+        self.regs[2] = self.pop_type(STRING_TYPES)  # lhs
+        self.regs[1] = self.pop_type(STRING_TYPES)  # rhs
+        self.regs[1] = concat(self.regs[1], self.regs[2])
         self.push(self.regs[1])
 
     def __str_chop(self):  # pragma: no cover
-        self.regs[1] = self.pop_type(int)
-        self.regs[2] = self.pop_type(str)
-        if not 0 <= self.regs[1] < len(self.regs[2]):
+        index = self.pop_type(int)
+        self.regs[2] = self.pop_type(STRING_TYPES)
+        self.regs[1] = index
+        if not 0 <= index < len(self.regs[2]):
             raise ValueError("Invalid value for SCHOP.")
-        self.push((self.regs[2])[self.regs[1] :])  # pylint: disable=E1136
-        self.push((self.regs[2])[: self.regs[1]])  # pylint: disable=E1136
+        self.push(substring(self.regs[2], index, len(self.regs[2])))
+        self.push(substring(self.regs[2], 0, index))
 
     def __str_offset(self):  # pragma: no cover
-        self.regs[2] = self.pop_type(str)
+        self.regs[2] = self.pop_type(STRING_TYPES)
         self.regs[1] = self.pop_type(int)
         if not 0 <= self.regs[1] < len(self.regs[2]):
             raise ValueError("Invalid value for SOFF.")
@@ -229,24 +490,49 @@ class LogoVM:
     def __intr(self, intr):
         if not 0 <= intr < len(self.intr):  # pragma: no cover
             raise ExtensionError(f"Invalid interruption: {intr}")
-        logging.debug("LogoVM: INTR: %d", intr)
-        logging.debug("LogoVM: INTR Function: %s", repr(self.intr[intr]))
         self.intr[intr](self)
 
+    def __immediate(self, oper, value):
+        self.regs[1] = oper(self.pop_type((int, float)), value)
+        self.push(self.regs[1])
+
+    def __inc_heap(self, addr, value):
+        self.regs[1] = self.mem.get_heap(addr)
+        self.__check_type(self.regs[1], (int, float))
+        self.mem.set_heap(addr, self.regs[1] + value)
+
+    def __cmp_jump(self, jump, target):
+        self.__cmp()
+        self.__ops[jump](target)
+
+    def __tee(self, addr):
+        self.push(self.pop())
+        self.mem.set_heap(addr, self.regs[1])
+
+    def __dup(self):
+        self.regs[1] = self.mem.stack.dup()
+
+    def __swap(self):
+        self.regs[1] = self.mem.stack.swap()
+
     def __halt(self):
         self.running = False
 
     def __ret(self):  # pragma: no cover
-        self.pc = self.callstack.pop()[0]
+        self.pc = self.callstack.pop()
 
     # operations
     def __get_op(self, command):
-        __commands = {
+        """Retrieve operation, building the whole operation table."""
+        return self.__build_ops().get(command)
+
+    def __build_ops(self):
+        return {
             # No arg, no Stack
             0: lambda: None,  # NOP
             1: self.__halt,  # HALT
             2: self.__ret,  # RET
-            3: random,  # RAND
+            3: lambda: self.push(self.random.random()),  # RAND
             6: lambda: self.__jump_cond(  # SKIPZ
                 self.pc + 2, self.regs[0] == 0
             ),
@@ -255,30 +541,28 @@ class LogoVM:
             ),
             # No arg, One Stack
             8: self.pop,  # POP
-            9: lambda: [self.push(value) for value in [self.pop()] * 2],  # DUP
+            9: self.__dup,  # DUP
             10: lambda: self.push(int(self.pop())),  # INT (TRUNC)
             11: lambda: self.push(float(self.pop())),  # FLOAT
             12: lambda: self.push(str(self.pop())),  # STRING
             16: lambda: self.push(abs(self.pop())),  # ABS
             17: self.__invert,  # NOT
             # No arg, Two Stack
-            24: lambda: [  # SWAP
-                self.push(value) for value in [self.pop(), self.pop()]
-            ],
+            24: self.__swap,  # SWAP
             25: self.__cmp,  # CMP
             # No arg, Two Stack NUMBER
-            30: lambda: self.__binop("+"),  # ADD
-            31: lambda: self.__binop("-"),  # SUB
-            32: lambda: self.__binop("*"),  # MUL
-            33: lambda: self.__binop("+"),  # DIV
+            30: partial(self.__binop, operator.add),  # ADD
+            31: partial(self.__binop, operator.sub),  # SUB
+            32: partial(self.__binop, operator.mul),  # MUL
+            33: partial(self.__binop, operator.truediv),  # DIV
             34: self.__idiv,  # IDIV
-            35: lambda: self.__binop("**"),  # POW
+            35: partial(self.__binop, operator.pow),  # POW
             # No arg, Two Stack INT
-            41: lambda: self.__bitop("&"),  # AND
-            42: lambda: self.__bitop("|"),  # OR
-            43: lambda: self.__bitop("^"),  # XOR
-            44: lambda: self.__bitop(">>"),  # SHFTR
-            45: lambda: self.__bitop("<<"),  # SHFTL
+            41: partial(self.__bitop, operator.and_),  # AND
+            42: partial(self.__bitop, operator.or_),  # OR
+            43: partial(self.__bitop, operator.xor),  # XOR
+            44: partial(self.__bitop, operator.rshift),  # SHFTR
+            45: partial(self.__bitop, operator.lshift),  # SHFTL
             46: self.__roll_right,  # ROLLR
             # No arg, two stack (string)
             125: self.__cat,  # CAT
@@ -318,14 +602,64 @@ class LogoVM:
             192: self.push,  # PUSHD
             # One STRING arg
             224: self.push,  # PUSHS
+            # Superinstructions, created by logovm.optimizer
+            256: lambda value: self.__immediate(operator.add, value),  # ADDI
+            257: lambda value: self.__immediate(operator.sub, value),  # SUBI
+            258: self.__inc_heap,  # INCH
+            259: self.__cmp_jump,  # CMPJ
+            260: self.__tee,  # TEE
+            261: lambda value, intr: (  # INTRI
+                self.push(value),
+                self.__intr(intr),
+            ),
         }
-        # Flags
-        return __commands.get(command)
 
-    def set_interrupt(self, index, function):
-        """Set one of the machine interrupt callbacks."""
+    def get_operation(self, command):
+        """Retrieve the operation that implements an instruction."""
+        return self.__ops.get(command)
+
+    def set_interrupt(self, index, function, effect=None):
+        """
+        Set one of the machine interrupt callbacks.
+
+        The stack effect of the interrupt, used for program verification,
+        is an (inputs, outputs) pair with the kind of the values popped
+        and pushed, from bottom to top ("i", "d", "n", "s" or None), or
+        logovm.verifier.COUNTED. If not given, the effect is unknown.
+        """
         logging.debug("LogoVM: Setting INTR %d to %s", index, repr(function))
         self.intr[index] = function
+        self.intr_effects[index] = effect
+
+    def add_trace_hook(self, event, hook, interval=1):
+        """
+        Add a hook called on an execution event.
+
+        Hooks are called as hook(logo_vm, pc, value), where 'value' is the
+        instruction for "instruction" events, the interrupt number for
+        "interrupt" and "interrupt_exit", and the address where execution
+        continues for "call" and "return". Instruction hooks are called
+        once every 'interval' instructions.
+
+        While any hook is set, programs run in a separate traced loop,
+        using the operation table, whatever the engine selected.
+        """
+        if event not in self.TRACE_EVENTS:
+            raise LogoVMError(f"Invalid trace event: {event}")
+        if interval < 1:
+            raise LogoVMError(f"Invalid trace interval: {interval}")
+        self.__trace[event].append((hook, interval))
+
+    def remove_trace_hook(self, event, hook):
+        """Remove a hook added with add_trace_hook."""
+        self.__trace[event] = [
+            entry for entry in self.__trace.get(event, []) if entry[0] != hook
+        ]
+
+    @property
+    def traced(self):
+        """Check if any trace hook is set."""
+        return any(self.__trace.values())
 
     @property
     def pc(self):
@@ -343,22 +677,20 @@ class LogoVM:
         try:
             self.__execute(*args, **kwargs)
         except Exception as exception:  # pylint: disable=broad-except
-            print(f"{str(exception)} - PC={self.pc}", file=sys.stderr)
-            if self.callstack:  # pragma: no cover
-                print("Stack trace:", file=sys.stderr)
-                print(
-                    "\n".join(f"    {x}" for x in self.callstack),
-                    file=sys.stderr,
-                )
+            self.__flush_output()
+            self.__report(exception)
 
-    def __execute(self, *args, **kwargs):
-        """Execute a loaded program."""
+    def start(self, *args, **kwargs):
+        """
+        Prepare the machine to execute the program with run() or step().
+
+        Arguments are the same of execute().
+        """
         self.console = (
             kwargs.get("stdin", self.console[0]),
             kwargs.get("stdout", self.console[1]),
             kwargs.get("stderr", self.console[2]),
         )
-        sys.stdin = self.console[0]
         # Load argumens to the Stack
         for arg in args:  # pragma: no cover
             try:
@@ -370,14 +702,108 @@ class LogoVM:
                     pass
             self.push(arg)
         # start program
+        self.__pending = None
+        self.instructions = 0
         self.running = True
         self.pc = -1
+
+    def run(self, max_instructions=None):
+        """
+        Execute, at most, 'max_instructions' instructions.
+
+        Execution can be resumed by calling run() again, and stops when
+        the program halts, fails, or an interrupt suspends it, e.g. a
+        READ while no input is available. Trace hooks are not called.
+        The number of instructions executed since start() is kept in
+        the 'instructions' attribute. Return True if the program is
+        still running. Once the program stops, or before start(), run()
+        does nothing and returns False.
+        """
+        if not self.running:
+            return False
+        try:
+            if self.__pending is not None:
+                resume, self.__pending = self.__pending, None
+                resume(self)
+            self.__run_quantum(max_instructions)
+        except LogoVMSuspend as suspend:
+            logging.debug("LogoVM: Suspended: %s", suspend.reason)
+            self.__pending = suspend.resume
+            self.__flush_output()
+            return True
+        except Exception as exception:  # pylint: disable=broad-except
+            self.running = False
+            self.__flush_output()
+            self.__report(exception)
+            return False
+        if not self.running:  # stopped during this run
+            self.intr[0](self)  # shutdown
+            self.__flush_output()
+        return self.running
+
+    def step(self):
+        """Execute a single instruction, return True if still running."""
+        return self.run(1)
+
+    @property
+    def suspended(self):
+        """Check if execution is suspended, waiting an interrupt."""
+        return self.__pending is not None
+
+    def __flush_output(self):
+        """Flush console output, which may be buffered."""
+        flush = getattr(self.console[1], "flush", None)
+        if flush is not None:
+            flush()
+
+    def __report(self, exception):
+        print(
+            f"{str(exception)} - PC={self.__format_pc(self.pc)}",
+            file=self.console[2],
+        )
+        if self.callstack:  # pragma: no cover
+            print("Stack trace:", file=self.console[2])
+            print(
+                "\n".join(
+                    f"    {self.__format_pc(x)}" for x in self.callstack
+                ),
+                file=self.console[2],
+            )
+
+    def source_location(self, pc):
+        """Describe the source location of 'pc', using debug information."""
+        debug = self.mem.debug
+        return debug.describe(pc) if debug else None
+
+    def __format_pc(self, pc):
+        location = self.source_location(pc)
+        return f"{pc} ({location})" if location else f"{pc}"
+
+    def __execute(self, *args, **kwargs):
+        """Execute a loaded program."""
+        self.start(*args, **kwargs)
+        if self.traced:
+            self.__run_traced()
+        elif self.engine == "reference":
+            self.__run_reference()
+        elif self.engine == "table" and isinstance(self.code, PackedCode):
+            self.__run_packed()
+        elif self.engine == "table":
+            self.__run_table()
+        elif self.engine == "compiled":
+            self.__compiler.run()
+        else:
+            self.__run_threaded()
+        self.intr[0](self)  # shutdown
+        self.__flush_output()
+
+    def __run_reference(self):
+        """Run program decoding operations at every instruction."""
         while self.running:
             self.pc += 1
             if not 0 <= self.pc < len(self.code):
                 raise LogoVMError(f"Invalid PC: {self.pc}")  # pragma: no cover
             cmd, *args = self.code[self.pc]
-            logging.debug("LogoVM Instruction: %s - %s", cmd, repr(args))
             ops = self.__get_op(cmd)
             if ops:
                 self.__exec_ops(ops, *args)
@@ -385,9 +811,163 @@ class LogoVM:
                 raise LogoVMError(
                     f"Invalid command: {cmd}"
                 )  # pragma: no cover
-        self.intr[0](self)  # shutdown
+
+    def __run_table(self):
+        """Run program using the operation table built with the VM."""
+        code = self.code
+        operations = self.__ops
+        while self.running:
+            self.pc += 1
+            if not 0 <= self.pc < len(code):
+                raise LogoVMError(f"Invalid PC: {self.pc}")  # pragma: no cover
+            cmd, *args = code[self.pc]
+            try:
+                ops = operations[cmd]
+            except KeyError:  # pragma: no cover
+                raise LogoVMError(f"Invalid command: {cmd}") from None
+            ops(*args)
+
+    def __run_packed(self):
+        """Run packed code, without building the instruction tuples."""
+        opcodes = self.code.opcodes
+        operands = self.code.operands
+        argument = self.code.argument
+        operations = self.__ops
+        regs = self.regs
+        size = len(opcodes)
+        while self.running:
+            regs[-1] += 1
+            pc = regs[-1]
+            if not 0 <= pc < size:
+                raise LogoVMError(f"Invalid PC: {pc}")  # pragma: no cover
+            cmd = opcodes[pc]
+            try:
+                ops = operations[cmd]
+            except KeyError:  # pragma: no cover
+                raise LogoVMError(f"Invalid command: {cmd}") from None
+            if cmd < 128:
+                ops()
+            else:
+                ops(argument(cmd, operands[pc]))
+
+    def __run_quantum(self, count):
+        """Run up to 'count' instructions, or until the program stops."""
+        limit = -1 if count is None else count
+        if self.engine in ("threaded", "adaptive"):
+            self.__quantum_threaded(limit)
+        elif self.engine == "compiled" and count is None:
+            # blocks cannot stop halfway, so only full runs use them.
+            self.__compiler.run()
+        else:
+            self.__quantum_table(limit)
+
+    def __quantum_threaded(self, limit):
+        """Run up to 'limit' pre-bound operations."""
+        threaded = self.__threaded
+        regs = self.regs
+        size = len(threaded)
+        start = limit
+        try:
+            while self.running and limit != 0:
+                limit -= 1
+                regs[-1] += 1
+                if not 0 <= regs[-1] < size:
+                    raise LogoVMError(  # pragma: no cover
+                        f"Invalid PC: {self.pc}"
+                    )
+                threaded[regs[-1]]()
+        finally:
+            self.instructions += start - limit
+
+    def __quantum_table(self, limit):
+        """Run up to 'limit' instructions, using the operation table."""
+        code = self.code
+        operations = self.__ops
+        regs = self.regs
+        size = len(code)
+        start = limit
+        try:
+            while self.running and limit != 0:
+                limit -= 1
+                regs[-1] += 1
+                pc = regs[-1]
+                if not 0 <= pc < size:
+                    raise LogoVMError(f"Invalid PC: {pc}")  # pragma: no cover
+                cmd, *args = code[pc]
+                try:
+                    ops = operations[cmd]
+                except KeyError:  # pragma: no cover
+                    raise LogoVMError(f"Invalid command: {cmd}") from None
+                ops(*args)
+        finally:
+            self.instructions += start - limit
+
+    def __run_threaded(self):
+        """Run program from the pre-bound operations built on setup."""
+        threaded = self.__threaded
+        regs = self.regs
+        size = len(threaded)
+        while self.running:
+            regs[-1] += 1
+            if not 0 <= regs[-1] < size:
+                raise LogoVMError(f"Invalid PC: {self.pc}")  # pragma: no cover
+            threaded[regs[-1]]()
+
+    def __run_traced(self):
+        """Run program calling the trace hooks."""
+        code = self.code
+        operations = self.__ops
+        regs = self.regs
+        instruction_hooks = self.__trace["instruction"]
+        events = self.__trace_events()
+        count = 0
+        while self.running:
+            regs[-1] += 1
+            pc = regs[-1]
+            if not 0 <= pc < len(code):
+                raise LogoVMError(f"Invalid PC: {pc}")  # pragma: no cover
+            instruction = code[pc]
+            count += 1
+            for hook, interval in instruction_hooks:
+                if count % interval == 0:
+                    hook(self, pc, instruction)
+            cmd, *args = instruction
+            try:
+                ops = operations[cmd]
+            except KeyError:  # pragma: no cover
+                raise LogoVMError(f"Invalid command: {cmd}") from None
+            event = events.get(cmd)
+            if event is None:
+                ops(*args)
+            else:
+                self.__run_event(event, pc, ops, args)
+
+    def __trace_events(self):
+        """Map the commands that trigger hooked events to the events."""
+        trace = self.__trace
+        events = {}
+        if trace["call"]:
+            events[134] = "call"  # CALL
+        if trace["return"]:
+            events[2] = "return"  # RET
+        if trace["interrupt"] or trace["interrupt_exit"]:
+            events[159] = events[261] = "interrupt"  # INTR, INTRI
+        return events
+
+    def __run_event(self, event, pc, ops, args):
+        """Execute an operation, calling the hooks of its event."""
+        trace = self.__trace
+        if event == "interrupt":
+            for hook, _ in trace["interrupt"]:
+                hook(self, pc, args[-1])
+            ops(*args)
+            for hook, _ in trace["interrupt_exit"]:
+                hook(self, pc, args[-1])
+        else:
+            ops(*args)
+            for hook, _ in trace[event]:
+                hook(self, pc, self.regs[-1] + 1)
 
     def __exec_ops(self, operation, *args):
         """Execute a single operation."""
-        # Here is were "DEBUG" can be implemented.
         operation(*args)
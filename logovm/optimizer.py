@@ -0,0 +1,142 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Peephole optimizer for LogoVM code."""
+
+# Internal superinstructions. They never appear on program files, so
+# they use values that do not fit in a bytecode.
+ADDI = 256  # PUSHI n; ADD
+SUBI = 257  # PUSHI n; SUB
+INCH = 258  # LOAD a; PUSHI n; ADD|SUB; STORE a
+CMPJ = 259  # CMP; JLESS|JMORE|JZ|JNZ
+TEE = 260  # DUP; STORE a
+INTRI = 261  # PUSHI n; INTR i
+
+JUMPS = (129, 130, 131, 132, 133, 134)  # JP, JLESS, JMORE, JZ, JNZ, CALL
+SKIPS = (6, 7)  # SKIPZ, SKIPNZ
+JR = 161
+
+# Original instructions of each superinstruction, from its arguments.
+EXPANSIONS = {
+    ADDI: lambda value: [(160, value), (30,)],
+    SUBI: lambda value: [(160, value), (31,)],
+    INCH: lambda addr, value: [(128, addr), (160, value), (30,), (140, addr)],
+    CMPJ: lambda jump, target: [(25,), (jump, target)],
+    TEE: lambda addr: [(9,), (140, addr)],
+    INTRI: lambda value, intr: [(160, value), (159, intr)],
+}
+
+
+class PeepholeOptimizer:
+    """Rewrite common instruction sequences into superinstructions."""
+
+    @staticmethod
+    def optimize(code, origins=None):
+        """
+        Return an optimized copy of 'code', with jumps remapped.
+
+        If 'origins' is given, the PC in the original code of each
+        optimized instruction is appended to it.
+        """
+        targets, fixed = PeepholeOptimizer.__boundaries(code)
+        optimized = []
+        sources = []
+        remap = {}
+        pc = 0
+        while pc < len(code):
+            remap[pc] = len(optimized)
+            sources.append(pc)
+            instruction, size = code[pc], 1
+            if pc not in fixed:
+                instruction, size = PeepholeOptimizer.__fuse(code, pc, targets)
+            optimized.append(instruction)
+            pc += size
+        remap[len(code)] = len(optimized)
+        # invalid targets remain invalid.
+        shift = len(optimized) - len(code)
+        for pc, (cmd, *args) in enumerate(optimized):
+            if cmd in JUMPS:
+                optimized[pc] = (cmd, remap.get(args[0], args[0] + shift))
+            elif cmd == CMPJ:
+                target = remap.get(args[1], args[1] + shift)
+                optimized[pc] = (cmd, args[0], target)
+            elif cmd == JR:
+                target = sources[pc] + args[0]
+                target = remap.get(target, target + shift)
+                optimized[pc] = (cmd, target - pc)
+        if origins is not None:
+            origins.extend(sources)
+        return optimized
+
+    @staticmethod
+    def expand(instruction):
+        """Expand a superinstruction into the original instructions."""
+        cmd, *args = instruction
+        expansion = EXPANSIONS.get(cmd)
+        return expansion(*args) if expansion else [instruction]
+
+    @staticmethod
+    def __boundaries(code):
+        """Find jump targets, and instructions that must not be fused."""
+        targets = set()
+        fixed = set()
+        for pc, (cmd, *args) in enumerate(code):
+            if cmd in JUMPS:
+                targets.add(args[0])
+            elif cmd == JR:
+                targets.add(pc + args[0])
+            elif cmd in SKIPS:
+                # skipped instruction must remain a single instruction.
+                targets.update((pc + 1, pc + 2))
+                fixed.add(pc + 1)
+        return targets, fixed
+
+    @staticmethod
+    def __fuse(code, pc, targets):
+        """Fuse instructions starting at pc, if a pattern matches."""
+        for size in (4, 2):
+            window = code[pc : pc + size]
+            if len(window) < size or targets.intersection(
+                range(pc + 1, pc + size)
+            ):
+                continue
+            fused = PeepholeOptimizer.__match(window)
+            if fused:
+                return fused, size
+        return code[pc], 1
+
+    @staticmethod
+    def __match(window):
+        # pylint: disable=too-many-return-statements
+        match window:
+            case [(128, addr), (160, value), (30,), (140, target)]:
+                if addr == target:
+                    return (INCH, addr, value)
+            case [(128, addr), (160, value), (31,), (140, target)]:
+                if addr == target:
+                    return (INCH, addr, -value)
+            case [(160, value), (30,)]:
+                return (ADDI, value)
+            case [(160, value), (31,)]:
+                return (SUBI, value)
+            case [(25,), (jump, target)] if jump in range(130, 134):
+                return (CMPJ, jump, target)
+            case [(9,), (140, addr)]:
+                return (TEE, addr)
+            case [(160, value), (159, intr)]:
+                return (INTRI, value, intr)
+        return None
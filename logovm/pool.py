@@ -0,0 +1,128 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Loaded program images, and pools of machines running them."""
+
+import importlib
+from contextlib import contextmanager
+from threading import Lock
+
+from logovm import get_extension
+from logovm.errors import ExtensionError
+from logovm.loader import DataTranslator, LogoVMLoader
+from logovm.machine import LogoVM
+from logovm.optimizer import PeepholeOptimizer
+
+
+class ProgramImage:
+    """
+    A program loaded once, to be run by many machines.
+
+    The image keeps the decoded code, shared by every machine, and the
+    initial heap values, copied to each new machine.
+    """
+
+    def __init__(
+        self, osinit, code, data, debug, osname=None
+    ):  # pylint: disable=too-many-arguments
+        """Initialize image from loaded program data."""
+        self.osinit = osinit
+        self.code = code
+        self.data = tuple(data or ())
+        self.debug = debug
+        if osname is None:
+            osname = DataTranslator.parse_data(osinit, [("name", "s")])["name"]
+        self.extension = ProgramImage.find_extension(osname)
+
+    @staticmethod
+    def load(inputstream, optimize=False, **options):
+        """Load an image from a program stream."""
+        osinit, code, data, debug = LogoVMLoader.load_program(
+            inputstream, LogoVM.__version__, **options
+        )
+        if optimize:
+            origins = []
+            code = PeepholeOptimizer.optimize(code, origins)
+            debug = debug.relocated(origins)
+        return ProgramImage(osinit, code, data, debug)
+
+    @staticmethod
+    def find_extension(osname):
+        """Import and retrieve the extension class for 'osname'."""
+        # load extension (currently limited to LogoVM provided ones).
+        try:
+            importlib.import_module(f"logovm.{osname.lower()}")
+        except ImportError:
+            pass
+        extension = get_extension(osname)
+        if extension is None:
+            raise ExtensionError(f"Invalid extension: {osname}")
+        return extension
+
+    def create_machine(self, **options):
+        """Create a machine running this image, with LogoVM options."""
+        machine = LogoVM(**options)
+        machine.setup(self.code, list(self.data), self.debug)
+        self.extension(machine, self.osinit)
+        return machine
+
+
+class VMPool:
+    """
+    Pool of machines running the same program image.
+
+    Machines are created on demand, and reset when released, so that
+    running a program many times does not pay for machine, extension
+    and video memory creation on every run. At most 'size' idle
+    machines are kept.
+    """
+
+    def __init__(self, image, size=16, **options):
+        """Initialize pool for 'image', with LogoVM options."""
+        self.image = image
+        self.size = size
+        self.options = options
+        self.__idle = []
+        self.__lock = Lock()
+
+    def acquire(self):
+        """Retrieve a machine ready to execute the program."""
+        with self.__lock:
+            if self.__idle:
+                return self.__idle.pop()
+        return self.image.create_machine(**self.options)
+
+    def release(self, machine):
+        """Reset a machine, and return it to the pool."""
+        machine.reset()
+        with self.__lock:
+            if len(self.__idle) < self.size:
+                self.__idle.append(machine)
+
+    @contextmanager
+    def machine(self):
+        """Use a machine from the pool, in a 'with' statement."""
+        machine = self.acquire()
+        try:
+            yield machine
+        finally:
+            self.release(machine)
+
+    def execute(self, *args, **kwargs):
+        """Execute the program on a pooled machine."""
+        with self.machine() as machine:
+            machine.execute(*args, **kwargs)
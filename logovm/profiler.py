@@ -0,0 +1,241 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Profiler for LogoVM programs."""
+
+import json
+from collections import Counter
+from time import perf_counter
+
+MNEMONICS = {
+    0: "NOP",
+    1: "HALT",
+    2: "RET",
+    3: "RAND",
+    6: "SKIPZ",
+    7: "SKIPNZ",
+    8: "POP",
+    9: "DUP",
+    10: "INT",
+    11: "FLOAT",
+    12: "STRING",
+    16: "ABS",
+    17: "NOT",
+    24: "SWAP",
+    25: "CMP",
+    30: "ADD",
+    31: "SUB",
+    32: "MUL",
+    33: "DIV",
+    34: "IDIV",
+    35: "POW",
+    41: "AND",
+    42: "OR",
+    43: "XOR",
+    44: "SHFTR",
+    45: "SHFTL",
+    46: "ROLLR",
+    125: "CAT",
+    126: "SCHOP",
+    127: "SOFF",
+    128: "LOAD",
+    129: "JP",
+    130: "JLESS",
+    131: "JMORE",
+    132: "JZ",
+    133: "JNZ",
+    134: "CALL",
+    140: "STORE",
+    156: "SETF",
+    157: "UNSETF",
+    158: "ISSETF",
+    159: "INTR",
+    160: "PUSHI",
+    161: "JR",
+    192: "PUSHD",
+    224: "PUSHS",
+    256: "ADDI",
+    257: "SUBI",
+    258: "INCH",
+    259: "CMPJ",
+    260: "TEE",
+    261: "INTRI",
+}
+
+
+def mnemonic(cmd):
+    """Return the mnemonic of an opcode."""
+    return MNEMONICS.get(cmd, str(cmd))
+
+
+class Profiler:
+    """
+    Collect execution profile of a LogoVM program, using trace hooks.
+
+    With an 'interval' of 1, every instruction is counted. Otherwise,
+    one instruction every 'interval' instructions is sampled, and
+    counts are estimates, scaled by the interval. Interrupt handlers
+    are timed, and the cost of subroutines is measured in (estimated)
+    executed instructions, including (inclusive) or not (exclusive)
+    the cost of the subroutines they call.
+    """
+
+    def __init__(self, logo_vm, interval=1):
+        """Initialize profiler for logo_vm."""
+        self.vm = logo_vm
+        self.interval = interval
+        self.samples = Counter()
+        self.interrupts = {}
+        self.calls = {}
+        self.__frames = []
+        self.__intr_start = []
+        self.__sampled = 0
+
+    def install(self):
+        """Add the profiler hooks to the machine."""
+        self.vm.add_trace_hook("instruction", self.__sample, self.interval)
+        self.vm.add_trace_hook("interrupt", self.__intr_enter)
+        self.vm.add_trace_hook("interrupt_exit", self.__intr_exit)
+        self.vm.add_trace_hook("call", self.__call)
+        self.vm.add_trace_hook("return", self.__return)
+
+    def uninstall(self):
+        """Remove the profiler hooks from the machine."""
+        self.vm.remove_trace_hook("instruction", self.__sample)
+        self.vm.remove_trace_hook("interrupt", self.__intr_enter)
+        self.vm.remove_trace_hook("interrupt_exit", self.__intr_exit)
+        self.vm.remove_trace_hook("call", self.__call)
+        self.vm.remove_trace_hook("return", self.__return)
+
+    @property
+    def instructions(self):
+        """Number of executed instructions, estimated if sampling."""
+        return self.__sampled * self.interval
+
+    def __sample(self, _logo_vm, pc, _instruction):
+        self.samples[pc] += 1
+        self.__sampled += 1
+
+    def __intr_enter(self, _logo_vm, _pc, _intr):
+        self.__intr_start.append(perf_counter())
+
+    def __intr_exit(self, _logo_vm, _pc, intr):
+        elapsed = perf_counter() - self.__intr_start.pop()
+        count, total = self.interrupts.get(intr, (0, 0.0))
+        self.interrupts[intr] = (count + 1, total + elapsed)
+
+    def __call(self, _logo_vm, _pc, target):
+        self.__frames.append([target, self.instructions, 0])
+
+    def __return(self, _logo_vm, _pc, _target):
+        if self.__frames:
+            self.__close_frame()
+
+    def __close_frame(self):
+        target, start, children = self.__frames.pop()
+        inclusive = self.instructions - start
+        count, total, own = self.calls.get(target, (0, 0, 0))
+        self.calls[target] = (
+            count + 1,
+            total + inclusive,
+            own + inclusive - children,
+        )
+        if self.__frames:
+            self.__frames[-1][2] += inclusive
+
+    def report(self):
+        """Return the collected profile as a dictionary."""
+        while self.__frames:  # program halted inside subroutines
+            self.__close_frame()
+        code = self.vm.code
+        interval = self.interval
+        opcodes = Counter()
+        for pc, count in self.samples.items():
+            opcodes[code[pc][0]] += count * interval
+        return {
+            "mode": "exact" if interval == 1 else "sampling",
+            "interval": interval,
+            "instructions": self.instructions,
+            "pcs": {
+                pc: {
+                    "count": count * interval,
+                    "instruction": mnemonic(code[pc][0]),
+                    "args": list(code[pc][1:]),
+                    "location": self.vm.source_location(pc),
+                }
+                for pc, count in self.samples.most_common()
+            },
+            "opcodes": {
+                mnemonic(cmd): count for cmd, count in opcodes.most_common()
+            },
+            "interrupts": {
+                intr: {"count": count, "time": total}
+                for intr, (count, total) in sorted(self.interrupts.items())
+            },
+            "calls": {
+                target: {
+                    "count": count,
+                    "inclusive": inclusive,
+                    "exclusive": exclusive,
+                    "location": self.vm.source_location(target),
+                }
+                for target, (count, inclusive, exclusive) in sorted(
+                    self.calls.items(), key=lambda item: -item[1][1]
+                )
+            },
+        }
+
+    def write_json(self, output):
+        """Write the profile report as JSON to a text stream."""
+        json.dump(self.report(), output, indent=2)
+        output.write("\n")
+
+    def format_report(self, top=10):
+        """Return a text report with the program hot spots."""
+        report = self.report()
+        lines = [
+            f"Profile ({report['mode']}, interval={report['interval']}):"
+            f" {report['instructions']} instructions",
+            "",
+            "Hot instructions:",
+        ]
+        for pc, entry in list(report["pcs"].items())[:top]:
+            args = " ".join(str(arg) for arg in entry["args"])
+            location = f"  ; {entry['location']}" if entry["location"] else ""
+            lines.append(
+                f"  {pc:>8} {entry['count']:>12}"
+                f"  {entry['instruction']} {args}".rstrip() + location
+            )
+        lines.extend(["", "Opcodes:"])
+        for name, count in list(report["opcodes"].items())[:top]:
+            lines.append(f"  {name:>8} {count:>12}")
+        if report["calls"]:
+            lines.extend(["", "Subroutines: count inclusive exclusive"])
+            for target, entry in list(report["calls"].items())[:top]:
+                location = entry["location"] or ""
+                lines.append(
+                    f"  {target:>8} {entry['count']:>12}"
+                    f" {entry['inclusive']:>12} {entry['exclusive']:>12}"
+                    f"  {location}".rstrip()
+                )
+        if report["interrupts"]:
+            lines.extend(["", "Interrupts: count time(s)"])
+            for intr, entry in report["interrupts"].items():
+                lines.append(
+                    f"  {intr:>8} {entry['count']:>12} {entry['time']:>12.6f}"
+                )
+        return "\n".join(lines)
@@ -0,0 +1,190 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""String values that avoid copies on concatenation and slicing."""
+
+# Strings shorter than this are always handled as 'str'.
+THRESHOLD = 256
+
+
+class VMString:
+    """
+    Base class for lazy VM string values.
+
+    Values behave as the string they represent for length, indexing,
+    comparison and conversion, and are flattened to 'str' when needed.
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        """Return the flattened string."""
+        raise NotImplementedError  # pragma: no cover
+
+    def __len__(self):
+        """Return the string length."""
+        raise NotImplementedError  # pragma: no cover
+
+    def __repr__(self):
+        """Return a representation of the string."""
+        return repr(str(self))
+
+    def __getitem__(self, index):
+        """Retrieve a character, or a view of a slice of the string."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return substring(self, start, stop)
+        return str(self)[index]
+
+    def __hash__(self):
+        """Hash as the flattened string."""
+        return hash(str(self))
+
+    def __eq__(self, other):
+        """Compare as strings."""
+        if isinstance(other, STRING_TYPES):
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __lt__(self, other):
+        """Compare as strings."""
+        if isinstance(other, STRING_TYPES):
+            return str(self) < str(other)
+        return NotImplemented
+
+    def __gt__(self, other):
+        """Compare as strings."""
+        if isinstance(other, STRING_TYPES):
+            return str(self) > str(other)
+        return NotImplemented
+
+    def __le__(self, other):
+        """Compare as strings."""
+        return not self > other
+
+    def __ge__(self, other):
+        """Compare as strings."""
+        return not self < other
+
+    def __int__(self):
+        """Convert string to int."""
+        return int(str(self))
+
+    def __float__(self):
+        """Convert string to float."""
+        return float(str(self))
+
+
+class Rope(VMString):
+    """
+    String built from a sequence of concatenated parts.
+
+    The parts list may be shared by ropes created by appending to each
+    other, as each rope only uses the first 'count' parts of it.
+    """
+
+    __slots__ = ("parts", "count", "length", "flat")
+
+    def __init__(self, parts, length):
+        """Initialize rope with a list of parts."""
+        self.parts = parts
+        self.count = len(parts)
+        self.length = length
+        self.flat = None
+
+    def __str__(self):
+        """Return the flattened string."""
+        if self.flat is None:
+            self.flat = "".join(
+                part if isinstance(part, str) else str(part)
+                for part in self.parts[: self.count]
+            )
+        return self.flat
+
+    def __len__(self):
+        """Return the string length."""
+        return self.length
+
+    def append(self, value):
+        """Return a new rope with value appended to this one."""
+        parts = self.parts
+        if len(parts) != self.count:
+            parts = parts[: self.count]
+        if isinstance(value, Rope):
+            parts.extend(value.parts[: value.count])
+        else:
+            parts.append(value)
+        return Rope(parts, self.length + len(value))
+
+
+class StrView(VMString):
+    """A view of part of a string, without copying it."""
+
+    __slots__ = ("base", "start", "stop", "flat")
+
+    def __init__(self, base, start, stop):
+        """Initialize view of base[start:stop]."""
+        self.base = base
+        self.start = start
+        self.stop = stop
+        self.flat = None
+
+    def __str__(self):
+        """Return the viewed string."""
+        if self.flat is None:
+            self.flat = self.base[self.start : self.stop]
+        return self.flat
+
+    def __len__(self):
+        """Return the string length."""
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        """Retrieve a character, or a view of a slice of the string."""
+        if isinstance(index, slice):
+            return super().__getitem__(index)
+        length = self.stop - self.start
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("string index out of range")
+        return self.base[self.start + index]
+
+
+STRING_TYPES = (str, VMString)
+
+
+def concat(lhs, rhs):
+    """Concatenate two VM strings."""
+    if len(lhs) + len(rhs) < THRESHOLD:
+        return f"{lhs}{rhs}"
+    if isinstance(lhs, Rope):
+        return lhs.append(rhs)
+    return Rope([lhs], len(lhs)).append(rhs)
+
+
+def substring(value, start, stop):
+    """Return value[start:stop], as a view for long strings."""
+    if isinstance(value, StrView):
+        offset = value.start
+        value, start, stop = value.base, offset + start, offset + stop
+    else:
+        value = str(value)
+    if stop - start < THRESHOLD:
+        return value[start:stop]
+    return StrView(value, start, stop)
@@ -0,0 +1,101 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Cooperative scheduling of many machines in an asyncio event loop."""
+
+import asyncio
+
+from logovm.console import SessionInput
+
+
+class Session:
+    """A machine executed by a Scheduler."""
+
+    def __init__(self, machine, task, pump=None):
+        """Initialize session for a started machine."""
+        self.machine = machine
+        self.input = machine.console[0]
+        self.task = task
+        self.pump = pump
+
+    def feed(self, text):
+        """Send text to the machine input."""
+        self.input.feed(text)
+
+    def close(self):
+        """Close the machine input."""
+        self.input.close()
+
+    def __await__(self):
+        """Wait for the machine to stop."""
+        return self.task.__await__()
+
+
+class Scheduler:
+    """
+    Round-robin scheduler for LogoVM machines.
+
+    Each machine runs 'quantum' instructions at a time, and then yields
+    to the event loop, so that all machines, and other tasks, progress
+    fairly. A machine suspended by a READ interrupt is parked until its
+    session input is fed, or closed.
+    """
+
+    def __init__(self, quantum=1000):
+        """Initialize scheduler."""
+        self.quantum = quantum
+        self.sessions = []
+
+    def spawn(self, machine, *args, **kwargs):
+        """
+        Start a machine as a new session, in the running event loop.
+
+        Arguments are the same of LogoVM.execute(). If 'stdin' is not
+        given, the session input is fed with Session.feed().
+        """
+        kwargs.setdefault("stdin", SessionInput())
+        machine.start(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        pump = None
+        if hasattr(machine.console[0], "pump"):
+            # keep a reference, so the task is not garbage collected.
+            pump = loop.create_task(machine.console[0].pump())
+        task = loop.create_task(self.__run(machine))
+        session = Session(machine, task, pump)
+        self.sessions.append(session)
+        return session
+
+    async def __run(self, machine):
+        quantum = self.quantum
+        ready = getattr(machine.console[0], "ready", None)
+        drain = getattr(machine.console[1], "drain", None)
+        while machine.run(quantum):
+            if drain is not None:
+                await drain()
+            if machine.suspended and ready is not None:
+                await ready.wait()
+            else:
+                await asyncio.sleep(0)
+        if drain is not None:
+            await drain()
+        return machine
+
+    async def join(self):
+        """Wait for all sessions to stop."""
+        while self.sessions:
+            sessions, self.sessions = self.sessions, []
+            await asyncio.gather(*(session.task for session in sessions))
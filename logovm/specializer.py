@@ -0,0 +1,128 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Adaptive specialization of LogoVM instructions."""
+
+import operator
+
+from logovm.rope import Rope, concat
+
+# Operations that can be specialized, and the operand types for which
+# a specialized version exists.
+SPECIALIZABLE = {
+    30: (operator.add, (int, float)),  # ADD
+    31: (operator.sub, (int, float)),  # SUB
+    32: (operator.mul, (int, float)),  # MUL
+    25: (None, (int, float, str)),  # CMP
+    125: (concat, (str, Rope)),  # CAT
+}
+
+
+class AdaptiveSpecializer:  # pylint: disable=too-few-public-methods
+    """
+    Rewrite threaded code with type specialized operations.
+
+    Specializable instructions start as observers, that execute the
+    generic operation while recording operand types. After the same
+    operand types are seen 'warmup' times in a row, the instruction is
+    replaced by a version for those types, guarded by a cheap type
+    test. If the guard fails, the generic operation is executed and the
+    instruction goes back to observing, until it is deoptimized
+    'max_deopt' times, when the generic operation is kept.
+    """
+
+    def __init__(self, logo_vm, threaded, warmup=8, max_deopt=4):
+        """Initialize specializer for the threaded code of logo_vm."""
+        self.vm = logo_vm
+        self.threaded = threaded
+        self.generic = list(threaded)
+        self.warmup = warmup
+        self.max_deopt = max_deopt
+        self.deopts = {}
+
+    def install(self):
+        """Replace specializable instructions with observers."""
+        for pc, (cmd, *_) in enumerate(self.vm.code):
+            if cmd in SPECIALIZABLE:
+                self.threaded[pc] = self.__observer(pc, cmd)
+
+    def __observer(self, pc, cmd):
+        stack = self.vm.mem.stack
+        data = stack.data
+        generic = self.generic[pc]
+        threaded = self.threaded
+        _, types = SPECIALIZABLE[cmd]
+        seen = [None, 0]
+
+        def observe():
+            top = stack.sp - 1
+            if top > 0 and type(data[top]) is type(data[top - 1]):
+                kind = type(data[top])
+            else:
+                kind = None
+            generic()
+            if kind is not seen[0]:
+                seen[:] = (kind, 0)
+            seen[1] += 1
+            if seen[1] >= self.warmup and kind in types:
+                threaded[pc] = self.__specialize(pc, cmd, kind)
+
+        return observe
+
+    def __deoptimize(self, pc, cmd):
+        self.deopts[pc] = self.deopts.get(pc, 0) + 1
+        if self.deopts[pc] >= self.max_deopt:
+            self.threaded[pc] = self.generic[pc]
+        else:
+            self.threaded[pc] = self.__observer(pc, cmd)
+        self.generic[pc]()
+
+    def __specialize(self, pc, cmd, kind):
+        # guards test the exact type recorded by the observer, which is
+        # cheaper than isinstance(), and never accepts subclasses.
+        # pylint: disable=unidiomatic-typecheck
+        stack = self.vm.mem.stack
+        data = stack.data
+        regs = self.vm.regs
+        operation, _ = SPECIALIZABLE[cmd]
+
+        def specialized_cmp():
+            top = stack.sp - 1
+            if (
+                top > 0
+                and type(data[top]) is kind
+                and type(data[top - 1]) is kind
+            ):
+                lhs, rhs = data[top - 1], data[top]
+                regs[0] = -1 if lhs < rhs else (1 if lhs > rhs else 0)
+                stack.sp = top - 1
+            else:
+                self.__deoptimize(pc, cmd)
+
+        def specialized():
+            top = stack.sp - 1
+            if (
+                top > 0
+                and type(data[top]) is kind
+                and type(data[top - 1]) is kind
+            ):
+                data[top - 1] = operation(data[top - 1], data[top])
+                stack.sp = top
+            else:
+                self.__deoptimize(pc, cmd)
+
+        return specialized_cmp if operation is None else specialized
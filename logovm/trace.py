@@ -0,0 +1,54 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Trace hooks for LogoVM."""
+
+import logging
+
+
+class TraceLogger:
+    """Trace hooks that log machine events."""
+
+    @staticmethod
+    def install(logo_vm, interval=1):
+        """Add logging trace hooks to logo_vm."""
+        logo_vm.add_trace_hook(
+            "instruction", TraceLogger.instruction, interval
+        )
+        logo_vm.add_trace_hook("interrupt", TraceLogger.interrupt)
+        logo_vm.add_trace_hook("call", TraceLogger.call)
+        logo_vm.add_trace_hook("return", TraceLogger.ret)
+
+    @staticmethod
+    def instruction(_logo_vm, pc, instruction):
+        """Log an executed instruction."""
+        logging.debug("LogoVM Instruction: %d - %s", pc, repr(instruction))
+
+    @staticmethod
+    def interrupt(logo_vm, _pc, intr):
+        """Log an interrupt call."""
+        logging.debug("LogoVM: INTR: %d - %s", intr, repr(logo_vm.intr[intr]))
+
+    @staticmethod
+    def call(_logo_vm, pc, target):
+        """Log a subroutine call."""
+        logging.debug("LogoVM: CALL: %d -> %d", pc, target)
+
+    @staticmethod
+    def ret(_logo_vm, pc, target):
+        """Log a subroutine return."""
+        logging.debug("LogoVM: RET: %d -> %d", pc, target)
@@ -30,6 +30,13 @@ except ImportError:  # pragma: no cover
 else:  # pragma: no cover
     HAS_PIL_IMAGE = True
 
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    HAS_NUMPY = False
+else:  # pragma: no cover
+    HAS_NUMPY = True
+
 from logovm import register_extension
 from logovm.loader import LogoVMLoader, DataTranslator
 from logovm.logoos import LogoOS
@@ -93,16 +100,18 @@ class TurtleOS(LogoOS):
             ]
             TurtleOS.configure(self, DataTranslator.parse_data(init, records))
             logo_vm.unset_flag(self.DRAW)
+        self.__initial_turtle = self.turtle
+        logo_vm.add_reset_hook(self.reset)
         self.ready = True
         logging.info("TurtleOS Initialized %s", repr(self.ready))
 
     def __set_interrupts(self, logo_vm):
-        logo_vm.set_interrupt(0, self.shutdown)
-        logo_vm.set_interrupt(3, self.set_pixel)
-        logo_vm.set_interrupt(4, self.move)
-        logo_vm.set_interrupt(5, self.move_to)
-        logo_vm.set_interrupt(6, self.get_pos)
-        logo_vm.set_interrupt(7, self.clear_screen)
+        logo_vm.set_interrupt(0, self.shutdown, ((), ()))
+        logo_vm.set_interrupt(3, self.set_pixel, (("i", "i"), ()))
+        logo_vm.set_interrupt(4, self.move, (("n", "n"), ()))
+        logo_vm.set_interrupt(5, self.move_to, (("i", "i"), ()))
+        logo_vm.set_interrupt(6, self.get_pos, ((), (None, None, "d")))
+        logo_vm.set_interrupt(7, self.clear_screen, ((), ()))
         logo_vm.set_flag(self.PEN)
 
     def shutdown(self, logo_vm):
@@ -119,7 +128,7 @@ class TurtleOS(LogoOS):
     def __save_as_PIL(self, filename):  # pylint: disable=invalid-name
         channels, _, _, width, height, mem = self.video
         mode = "L" if channels == 1 else "RGB"
-        Image.frombytes(mode, (width, height), bytes(mem)).save(
+        Image.frombuffer(mode, (width, height), mem, "raw", mode, 0, 1).save(
             f"{filename}.{self.imageformat}"
         )
 
@@ -197,12 +206,35 @@ class TurtleOS(LogoOS):
         logging.info("TurtleOS: Video size: %d, %d", width, height)
         logging.info("TurtleOS: Video deght: %d, %d", channels, bpc)
         logging.info("TurtleOS: Video memory size: %d", stride * height)
-        mem = [0] * (stride * height)
+        mem = bytearray(stride * height)
         self.video = VideoConfig(channels, bpc, stride, width, height, mem)
 
+    @property
+    def pixels(self):
+        """
+        Retrieve a NumPy array view of the video memory.
+
+        The view has one row per image line, and shares memory with the
+        video, so no data is copied. Return None if NumPy is not
+        available, or video is not initialized.
+        """
+        if not HAS_NUMPY or not self.video:
+            return None
+        _, _, stride, _, height, mem = self.video
+        return numpy.frombuffer(mem, dtype=numpy.uint8).reshape(height, stride)
+
+    def reset(self, logo_vm):
+        """Reset turtle, video memory and flags to their initial state."""
+        self.turtle = self.__initial_turtle
+        if self.video:
+            self.video.mem[:] = bytes(len(self.video.mem))
+        logo_vm.set_flag(self.PEN)
+        logo_vm.unset_flag(self.DRAW)
+
     def clear_screen(self, logo_vm):  # pragma: no cover
         """Clear graphic screen."""
-        self.reset_video()
+        # video memory is cleared in place, keeping views valid.
+        self.video.mem[:] = bytes(len(self.video.mem))
         logo_vm.unset_flag(self.DRAW)
 
     def __set_pixel(self, x, y, color):
@@ -212,20 +244,18 @@ class TurtleOS(LogoOS):
             raise TurtleOSError("TurtleOS: Video not initialized.") from None
         if not (0 <= x < width and 0 <= y < height):  # pragma: no cover
             return
-        pos = y * stride + x
-        mem[pos : pos + bpc] = (color,)
+        pos = y * stride + x * bpc
+        mem[pos] = color
 
     def set_pixel(self, logo_vm):
         """Set a pixel in video memory."""
-        y = logo_vm.pop_type(int)  # POP
-        x = logo_vm.pop_type(int)  # POP
+        x, y = logo_vm.pop_n_type(2, int)
         if logo_vm.is_set(self.PEN):
             self.__set_pixel(x, y, 255)
             logo_vm.set_flag(2)  # SETF 2
 
     def move(self, logo_vm):
         """Move turtle."""
-        logging.info("TurtleOS: MOVE")
         angle = logo_vm.pop()
         length = logo_vm.pop()
         logging.debug("TurtleOS: move %d %g", length, angle)
@@ -243,7 +273,6 @@ class TurtleOS(LogoOS):
 
     def move_to(self, logo_vm):
         """Move turtle."""
-        logging.info("TurtleOS: MOVETO")
         x0, y0, angle = self.turtle
         y1 = logo_vm.pop()
         x1 = logo_vm.pop()
@@ -255,9 +284,7 @@ class TurtleOS(LogoOS):
     def get_pos(self, logo_vm):
         """Retrieve turtle position."""
         x, y, angle = self.turtle
-        logo_vm.push(x)
-        logo_vm.push(y)
-        logo_vm.push((360.0 - angle) % 360)
+        logo_vm.push_many((x, y, (360.0 - angle) % 360))
 
     def __bresenham(self, logo_vm, start_point, end_point):
         if not self.video:  # pragma: no cover
@@ -267,16 +294,17 @@ class TurtleOS(LogoOS):
         # --
         x0, y0 = start_point
         x1, y1 = end_point
+        if not (isinstance(x0, int) and isinstance(y0, int)):
+            raise ValueError("Invalid data type for operation.")
+        set_pixel = self.__set_pixel
+        logo_vm.set_flag(self.DRAW)
         dx = abs(x1 - x0)
         sx = -1 if x1 < x0 else +1
         dy = -abs(y1 - y0)
         sy = -1 if y1 < y0 else +1
         error = dx + dy
         while True:
-            logo_vm.push(x0)
-            logo_vm.push(y0)
-            self.set_pixel(logo_vm)
-            # end of LogoVM code
+            set_pixel(x0, y0, 255)
             if int(x0) == int(x1) and int(y0) == int(y1):
                 break
             error2 = 2 * error
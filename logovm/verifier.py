@@ -0,0 +1,359 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Bytecode verifier for LogoVM programs."""
+
+from collections import namedtuple
+
+from logovm.errors import VerificationError
+from logovm.optimizer import PeepholeOptimizer
+
+# Value kinds: "i" (integer), "d" (double), "n" (integer or double),
+# "s" (string), None (unknown).
+NUMERIC = ("i", "d", "n")
+KIND_NAMES = {
+    "i": "integer",
+    "d": "double",
+    "n": "number",
+    "s": "string",
+    None: "unknown value",
+}
+
+# Interrupt stack effect for interrupts that pop a count, and then
+# 'count' values from the stack (e.g. LogoOS WRITE).
+COUNTED = "counted"
+
+VerifierResult = namedtuple(
+    "VerifierResult", "valid proven typed max_depth reason"
+)
+
+_RETURN = -1
+
+# Successors of control flow instructions, other than CALL, from their
+# address and arguments.
+BRANCHES = {
+    1: lambda pc, args: [],  # HALT
+    2: lambda pc, args: [_RETURN],  # RET
+    6: lambda pc, args: [pc + 1, pc + 2],  # SKIPZ
+    7: lambda pc, args: [pc + 1, pc + 2],  # SKIPNZ
+    129: lambda pc, args: [args[0]],  # JP
+    130: lambda pc, args: [args[0], pc + 1],  # JLESS
+    131: lambda pc, args: [args[0], pc + 1],  # JMORE
+    132: lambda pc, args: [args[0], pc + 1],  # JZ
+    133: lambda pc, args: [args[0], pc + 1],  # JNZ
+    161: lambda pc, args: [pc + args[0]],  # JR
+}
+
+
+class _Unproven(Exception):
+    """Raised when a program property cannot be proven."""
+
+
+def _merge_kind(lhs, rhs):
+    if lhs == rhs:
+        return lhs
+    if lhs in NUMERIC and rhs in NUMERIC:
+        return "n"
+    return None
+
+
+def _merge_entry(lhs, rhs):
+    if lhs == rhs:
+        return lhs
+    return (_merge_kind(lhs[0], rhs[0]), None)
+
+
+class _Frame:
+    """Abstract stack of a subroutine, relative to its entry point."""
+
+    def __init__(self, state, main):
+        stack, under = state
+        self.stack = list(stack)
+        self.under = under
+        self.main = main
+        self.peak = self.depth
+
+    @property
+    def depth(self):
+        """Stack depth relative to subroutine entry."""
+        return len(self.stack) - self.under
+
+    @property
+    def state(self):
+        """Frame state as an immutable value."""
+        return (tuple(self.stack), self.under)
+
+    def push(self, kind, const=None):
+        """Push a value to the abstract stack."""
+        self.stack.append((kind, const))
+        self.peak = max(self.peak, self.depth)
+
+    def pop(self, pc):
+        """Pop a value from the abstract stack."""
+        if self.stack:
+            return self.stack.pop()
+        if self.main:
+            raise VerificationError(f"PC {pc}: stack underflow")
+        self.under += 1
+        return (None, None)
+
+
+class BytecodeVerifier:  # pylint: disable=too-few-public-methods
+    """
+    Verify stack depth, heap access and operand types of a program.
+
+    Verification is done by abstract interpretation of every path of
+    the program, with subroutines analyzed once and summarized by the
+    number of values they consume from, and leave on, the stack.
+    """
+
+    def __init__(self, code, heap, effects, maxstack):
+        """
+        Initialize the verifier.
+
+        effects is a list with the stack effect of each interrupt, as
+        an (inputs, outputs) pair of kinds, COUNTED, or None if the
+        effect is not known.
+        """
+        self.code = code
+        self.heap = [self.__kind_of(value) for value in heap or []]
+        self.effects = effects
+        self.maxstack = maxstack
+        self.summaries = {}
+        self.active = []
+        self.typed = True
+        self.heap_changed = False
+
+    @staticmethod
+    def __kind_of(value):
+        if isinstance(value, int):
+            return "i"
+        if isinstance(value, float):
+            return "d"
+        return "s" if isinstance(value, str) else None
+
+    def verify(self):
+        """Verify the program, returning a VerifierResult."""
+        try:
+            self.heap_changed = True
+            while self.heap_changed:
+                self.summaries = {}
+                self.active = []
+                self.typed = True
+                self.heap_changed = False
+                _, peak = self.__analyze(0, main=True)
+        except VerificationError as error:
+            return VerifierResult(False, False, False, None, str(error))
+        except _Unproven as error:
+            return VerifierResult(True, False, False, None, str(error))
+        if peak > self.maxstack:
+            reason = f"Stack may grow to {peak} values."
+            return VerifierResult(True, False, False, peak, reason)
+        reason = None if self.typed else "Operand types not proven."
+        return VerifierResult(True, True, self.typed, peak, reason)
+
+    def __analyze(self, entry, main=False):
+        """Analyze the subroutine starting at entry."""
+        if entry in self.summaries:
+            return self.summaries[entry]
+        if entry in self.active:
+            raise _Unproven(f"Recursive CALL to {entry}.")
+        self.active.append(entry)
+        states = {entry: ((), 0)}
+        work = [entry]
+        returns = None
+        peak = 0
+        while work:
+            pc = work.pop()
+            frame = _Frame(states[pc], main)
+            successors = self.__instruction(pc, frame)
+            peak = max(peak, frame.peak)
+            for successor in successors:
+                if successor == _RETURN:
+                    if main:
+                        raise VerificationError(f"PC {pc}: RET without CALL")
+                    returns = self.__merge(pc, returns, frame.state)
+                    continue
+                if not 0 <= successor < len(self.code):
+                    raise VerificationError(
+                        f"PC {pc}: invalid jump target {successor}"
+                    )
+                merged = self.__merge(
+                    successor, states.get(successor), frame.state
+                )
+                if merged != states.get(successor):
+                    states[successor] = merged
+                    work.append(successor)
+        self.active.pop()
+        self.summaries[entry] = (returns, peak)
+        return self.summaries[entry]
+
+    @staticmethod
+    def __merge(pc, current, state):
+        """Merge two abstract states reaching the same instruction."""
+        if current is None:
+            return state
+        (lhs, lunder), (rhs, runder) = current, state
+        if len(lhs) != len(rhs) or lunder != runder:
+            raise VerificationError(
+                f"PC {pc}: inconsistent stack depth "
+                f"({len(lhs) - lunder} != {len(rhs) - runder})"
+            )
+        return (tuple(map(_merge_entry, lhs, rhs)), lunder)
+
+    def __require(self, pc, entry, kind):
+        """Check if a stack entry is of the expected kind."""
+        actual = entry[0]
+        if kind is None or actual == kind:
+            return
+        if kind == "n" and actual in NUMERIC:
+            return
+        if actual is None or (kind == "i" and actual == "n"):
+            self.typed = False
+            return
+        raise VerificationError(
+            f"PC {pc}: expected {KIND_NAMES[kind]}, "
+            f"found {KIND_NAMES[actual]}"
+        )
+
+    def __pop(self, pc, frame, *kinds):
+        """Pop values from bottom to top kinds, returning the entries."""
+        entries = [frame.pop(pc) for _ in kinds][::-1]
+        for entry, kind in zip(entries, kinds):
+            self.__require(pc, entry, kind)
+        return entries
+
+    def __instruction(self, pc, frame):
+        """Apply an instruction to frame, returning its successors."""
+        *body, last = PeepholeOptimizer.expand(self.code[pc])
+        for cmd, *args in body:
+            self.__execute(pc, frame, cmd, args)
+        cmd, *args = last
+        if cmd in BRANCHES:
+            return BRANCHES[cmd](pc, args)
+        if cmd == 134:  # CALL
+            return self.__call(pc, frame, args[0])
+        self.__execute(pc, frame, cmd, args)
+        return [pc + 1]
+
+    def __call(self, pc, frame, target):
+        if not 0 <= target < len(self.code):
+            raise VerificationError(f"PC {pc}: invalid CALL target {target}")
+        returns, peak = self.__analyze(target)
+        frame.peak = max(frame.peak, frame.depth + peak)
+        if returns is None:
+            return []
+        stack, under = returns
+        for _ in range(under):
+            frame.pop(pc)
+        for kind, const in stack:
+            frame.push(kind, const)
+        return [pc + 1]
+
+    # pylint: disable=too-many-branches
+    def __execute(self, pc, frame, cmd, args):
+        """Apply the stack effect of a non-branch instruction."""
+        match cmd:
+            case 0 | 156 | 157 | 158:  # NOP, SETF, UNSETF, ISSETF
+                pass
+            case 3:  # RAND
+                frame.push("d")
+            case 8:  # POP
+                self.__pop(pc, frame, None)
+            case 9:  # DUP
+                (entry,) = self.__pop(pc, frame, None)
+                frame.push(*entry)
+                frame.push(*entry)
+            case 10 | 11 | 12:  # INT, FLOAT, STRING
+                self.__pop(pc, frame, None)
+                frame.push({10: "i", 11: "d", 12: "s"}[cmd])
+            case 16:  # ABS
+                ((kind, _),) = self.__pop(pc, frame, None)
+                frame.push(kind if kind in NUMERIC else None)
+            case 17 | 46:  # NOT, ROLLR
+                self.__pop(pc, frame, "i")
+                frame.push("i")
+            case 24:  # SWAP
+                lhs, rhs = self.__pop(pc, frame, None, None)
+                frame.push(*rhs)
+                frame.push(*lhs)
+            case 25:  # CMP
+                self.__pop(pc, frame, None, None)
+            case 30 | 31 | 32 | 33 | 35:  # ADD, SUB, MUL, DIV, POW
+                (lhs, _), (rhs, _) = self.__pop(pc, frame, "n", "n")
+                if cmd in (33, 35):
+                    frame.push("d" if cmd == 33 else "n")
+                else:
+                    frame.push(lhs if lhs == rhs else "n")
+            case 34:  # IDIV
+                (lhs, _), (rhs, _) = self.__pop(pc, frame, "n", "n")
+                frame.push("i")
+                frame.push(lhs if lhs == rhs == "i" else "n")
+            case 41 | 42 | 43 | 44 | 45:  # AND, OR, XOR, SHFTR, SHFTL
+                self.__pop(pc, frame, "i", "i")
+                frame.push("i")
+            case 125:  # CAT
+                self.__pop(pc, frame, "s", "s")
+                frame.push("s")
+            case 126:  # SCHOP
+                self.__pop(pc, frame, "s", "i")
+                frame.push("s")
+                frame.push("s")
+            case 127:  # SOFF
+                self.__pop(pc, frame, "i", "s")
+                frame.push("s")
+            case 128:  # LOAD
+                frame.push(self.heap[self.__address(pc, args[0])])
+            case 140:  # STORE
+                addr = self.__address(pc, args[0])
+                ((kind, _),) = self.__pop(pc, frame, None)
+                merged = _merge_kind(self.heap[addr], kind)
+                if merged != self.heap[addr]:
+                    self.heap[addr] = merged
+                    self.heap_changed = True
+            case 159:  # INTR
+                self.__interrupt(pc, frame, args[0])
+            case 160:  # PUSHI
+                frame.push("i", args[0])
+            case 192:  # PUSHD
+                frame.push("d")
+            case 224:  # PUSHS
+                frame.push("s")
+            case _:
+                raise VerificationError(f"PC {pc}: invalid command {cmd}")
+
+    def __address(self, pc, addr):
+        if not 0 <= addr < len(self.heap):
+            raise VerificationError(f"PC {pc}: invalid heap address {addr}")
+        return addr
+
+    def __interrupt(self, pc, frame, intr):
+        if not 0 <= intr < len(self.effects):
+            raise VerificationError(f"PC {pc}: invalid interruption {intr}")
+        effect = self.effects[intr]
+        if effect is None:
+            raise _Unproven(f"PC {pc}: unknown stack effect for INTR {intr}")
+        if effect == COUNTED:
+            ((_, count),) = self.__pop(pc, frame, "i")
+            if count is None:
+                raise _Unproven(f"PC {pc}: unknown value count for INTR")
+            self.__pop(pc, frame, *([None] * count))
+            return
+        inputs, outputs = effect
+        self.__pop(pc, frame, *inputs)
+        for kind in outputs:
+            frame.push(kind)
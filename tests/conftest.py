@@ -29,8 +29,8 @@ from logovm.loader import LogoVMLoader
 def program_code():
     """Retrieve code and data for a program."""
 
-    def get_program(name):
-        return gen_program(*get_example_program_and_data(name))
+    def get_program(name, **options):
+        return gen_program(*get_example_program_and_data(name), **options)
 
     return get_program
 
@@ -39,8 +39,8 @@ def program_code():
 def logovm():
     """Retrieve a configured LogoVM."""
 
-    def get_logovm(program_data, os_class):
-        vminstance = LogoVM()
+    def get_logovm(program_data, os_class, **options):
+        vminstance = LogoVM(**options)
         osinit, *machine_data = LogoVMLoader.load_program(
             program_data, LogoVM.__version__
         )
@@ -1,10 +1,11 @@
 """Example program generation functions."""
 
 import io
+import lzma
 import struct
+import zlib
 from collections import namedtuple
 
-
 LogoOSHeader = namedtuple("LogoOSHeader", ["name", "version", "types"])
 TurtleOSHeader = namedtuple(
     "TurtleOSHeader",
@@ -82,6 +83,39 @@ __programs = {
         None,
         LogoOSHeader("LogoOS", (0, 2), ""),
     ),
+    "loop": (
+        [
+            160,
+            3,  # PUSHI 3
+            9,  # DUP            ; loop:
+            160,
+            1,  # PUSHI 1
+            159,
+            1,  # INTR @WRITE
+            160,
+            1,  # PUSHI 1
+            31,  # SUB
+            9,  # DUP
+            160,
+            0,  # PUSHI 0
+            25,  # CMP
+            131,
+            1,  # JMORE loop
+            8,  # POP
+            134,
+            13,  # CALL newline
+            1,  # HALT
+            224,
+            "\n",  # PUSHS "\n"   ; newline:
+            160,
+            1,  # PUSHI 1
+            159,
+            1,  # INTR @WRITE
+            2,  # RET
+        ],
+        None,
+        LogoOSHeader("LogoOS", (0, 2), ""),
+    ),
     "square": (
         [  # ; start at (0,0)
             160,
@@ -164,7 +198,6 @@ __programs = {
             9,  # PUSH 9
             159,
             5,  # INTR 5       ; moveto 9, 9
-            160,
             159,
             7,  # INTR 7       ; clrscr
             1,  # HALT
@@ -224,44 +257,134 @@ def __save_header(outfile, header):
         outfile.write(struct.pack(f"<{datatype}", data))
 
 
-def gen_program(code, data, header):
-    """Generate program from code and data."""
+def __debug_records(records):
+    """Encode source debug records: (F, file), (L, pc, line), (S, pc, name)."""
+    dbg_data = bytearray()
+    for kind, *values in records:
+        dbg_data.extend(kind.encode("utf-8"))
+        for value in values:
+            if isinstance(value, int):
+                dbg_data.extend(struct.pack("<Q", value))
+            else:
+                dbg_data.extend(value.encode("utf-8"))
+                dbg_data.append(0)
+    return dbg_data
+
+
+def __code_index(code):
+    """Build the instruction offset table of the code section."""
+    offsets = []
+    offset = 0
+    entry = 0
+    while entry < len(code):
+        size = 1 if code[entry] < 128 else 2
+        offsets.append(offset)
+        offset += len(__process_code(code[entry : entry + size]))
+        entry += size
+    return struct.pack(f"<{len(offsets)}Q", *offsets)
+
+
+def __process_records(code):
+    """Process code data as fixed width records, and a string pool."""
+    code_data = bytearray([])
+    pool = {}
+    entry = 0
+    while entry < len(code):
+        cmd = code[entry]
+        arg = 0
+        if cmd >= 128:
+            entry += 1
+            arg = code[entry]
+        match cmd:
+            case num if num in range(128, 160):
+                code_data.extend(struct.pack("<BQ", cmd, arg))
+            case num if num in range(192, 224):
+                code_data.extend(struct.pack("<Bd", cmd, arg))
+            case num if num >= 224:
+                index = pool.setdefault(arg, len(pool))
+                code_data.extend(struct.pack("<Bq", cmd, index))
+            case _:
+                code_data.extend(struct.pack("<Bq", cmd, arg))
+        entry += 1
+    pool_data = b"".join(f"{string}\0".encode("utf-8") for string in pool)
+    return code_data, pool_data
+
+
+def __write_section(outfile, mark, content, compress=None):
+    """Write a section, optionally compressed with 'zlib' or 'lzma'."""
+    if compress is None:
+        outfile.write(struct.pack("<ccccc", *__char_encode(mark)))
+        outfile.write(struct.pack("<Q", len(content)))
+        outfile.write(content)
+        return
+    method, module = {"zlib": (1, zlib), "lzma": (2, lzma)}[compress]
+    compressed = module.compress(bytes(content))
+    outfile.write(struct.pack("<ccccc", *__char_encode(".ZSEC")))
+    outfile.write(struct.pack("<ccccc", *__char_encode(mark)))
+    outfile.write(struct.pack("<BQQ", method, len(compressed), len(content)))
+    outfile.write(compressed)
+
+
+def __process_data(data):
+    """Process data values, and their debug records."""
+    out_data = bytearray([])
+    dbg_data = bytearray([])
+    dtypes = {int: ("i", "q"), float: ("d", "d"), str: ("s", None)}
+    for dbg, value in data:
+        data_type, cvt = dtypes[type(value)]
+        enc_type = data_type.encode("utf-8")[0]
+        out_data.append(enc_type)
+        if cvt:
+            out_data.extend(struct.pack(f"<{cvt}", value))
+        else:
+            encoded = value.encode("utf-8")
+            out_data.extend(encoded)
+            out_data.append(0)
+        dbg_data.append(enc_type)
+        dbg_data.extend(dbg.encode("utf-8"))
+        dbg_data.append(0)
+    return out_data, dbg_data
+
+
+def gen_program(
+    code,
+    data,
+    header,
+    debug=None,
+    *,
+    index=False,
+    version=(0, 2),
+    compress=None,
+):  # pylint: disable=too-many-arguments
+    """Generate program from code, data and source debug records."""
     with io.BytesIO() as outfile:
         # magic
         outfile.write(struct.pack("<cccc", *__char_encode("LOGO")))
-        # version = 0.2
-        outfile.write(bytes((0, 2)))
+        outfile.write(bytes(version))
         __save_header(outfile, header)
         # write code
-        code_data = __process_code(code)
-        outfile.write(struct.pack("<ccccc", *__char_encode(".CODE")))
-        outfile.write(struct.pack("<Q", len(code_data)))
-        outfile.write(bytes(code_data))
+        if version >= (0, 3):
+            code_data, pool_data = __process_records(code)
+            __write_section(outfile, ".POOL", pool_data, compress)
+        else:
+            code_data = __process_code(code)
+        __write_section(outfile, ".CODE", bytes(code_data), compress)
+        if index:
+            index_data = __code_index(code)
+            __write_section(outfile, ".CIDX", index_data, compress)
 
         # write data and debug
+        dbg_data = bytearray([])
         if data:
-            out_data = []
-            dbg_data = []
-            dtypes = {int: ("i", "q"), float: ("d", "d"), str: ("s", None)}
-            for dbg, value in data:
-                data_type, cvt = dtypes[type(value)]
-                enc_type = data_type.encode("utf-8")[0]
-                out_data.append(enc_type)
-                if cvt:
-                    out_data.extend(struct.pack(f"<{cvt}", value))
-                else:
-                    encoded = value.encode("utf-8")
-                    out_data.extend(encoded)
-                    out_data.append(0)
-                dbg_data.append(enc_type)
-                dbg_data.extend(dbg.encode("utf-8"))
-                dbg_data.append(0)
-            outfile.write(struct.pack("<ccccc", *__char_encode(".DATA")))
-            outfile.write(struct.pack("<Q", len(out_data)))
-            outfile.write(bytes(out_data))
-            outfile.write(struct.pack("<ccccc", *__char_encode(".DBUG")))
-            outfile.write(struct.pack("<Q", len(dbg_data)))
-            outfile.write(bytes(dbg_data))
+            out_data, dbg_data = __process_data(data)
+            __write_section(outfile, ".DATA", bytes(out_data), compress)
+        elif debug:
+            # debug section requires a (possibly empty) data section.
+            __write_section(outfile, ".DATA", b"", compress)
+        if debug:
+            dbg_data.extend(__debug_records(debug))
+        if dbg_data:
+            __write_section(outfile, ".DBUG", bytes(dbg_data), compress)
         return outfile.getvalue()
 
 
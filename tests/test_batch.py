@@ -0,0 +1,76 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Batch runner tests."""
+
+import io
+import json
+
+import pytest  # pylint: disable=import-error
+
+from logovm.batch import BatchRunner
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_batch_results(tmp_path, program_code, jobs):
+    """Test batch jobs results, in manifest order."""
+    for name in ["circle_area", "loop"]:
+        (tmp_path / f"{name}.logox").write_bytes(program_code(name))
+    entries = [
+        {"program": "circle_area.logox", "input": f"{ray}\n"}
+        for ray in range(1, 5)
+    ]
+    entries += [
+        {"program": "loop.logox", "expected": "321\n", "id": "ok"},
+        {"program": "loop.logox", "expected": "123\n"},
+        {"program": "missing.logox"},
+    ]
+    manifest = "\n".join(json.dumps(entry) for entry in entries)
+    jobs_list = BatchRunner.read_manifest(io.StringIO(manifest), str(tmp_path))
+    runner = BatchRunner(jobs, engine="table", optimize=True)
+    with io.StringIO() as output:
+        assert 1 == runner.write_results(jobs_list, output)
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [1, 2, 3, 4, "ok", 6, 7] == [result["id"] for result in results]
+    assert ["passed"] * 5 + ["failed", "error"] == [
+        result["status"] for result in results
+    ]
+    assert "Circle ray: Circle area: 3.141592\n" == results[0]["output"]
+    assert results[0]["instructions"] > 0
+    assert results[0]["instructions"] == results[1]["instructions"]
+    assert 0 == results[-1]["instructions"]
+
+
+@pytest.mark.parametrize("engine", ["threaded", "table", "compiled"])
+def test_batch_engines(tmp_path, program_code, engine):
+    """Test instructions are counted by every engine."""
+    (tmp_path / "loop.logox").write_bytes(program_code("loop"))
+    jobs = [{"program": str(tmp_path / "loop.logox"), "id": 1}]
+    (result,) = BatchRunner(engine=engine).run(jobs)
+    assert "passed" == result["status"]
+    assert 35 == result["instructions"]
+
+
+def test_batch_invalid_input(tmp_path, program_code):
+    """Test a job with invalid input fails, without stopping the batch."""
+    (tmp_path / "loop.logox").write_bytes(program_code("loop"))
+    jobs = [
+        {"program": str(tmp_path / "loop.logox"), "id": 1, "input": 1},
+        {"program": str(tmp_path / "loop.logox"), "id": 2},
+    ]
+    results = list(BatchRunner().run(jobs))
+    assert ["error", "passed"] == [result["status"] for result in results]
@@ -0,0 +1,99 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Program cache tests."""
+
+import io
+import os
+
+import pytest  # pylint: disable=import-error
+
+from logovm.cache import ProgramCache
+from logovm.loader import LogoVMLoader
+from logovm.machine import LogoVM
+from logovm.optimizer import PeepholeOptimizer
+
+
+def cached_load(cache, program, optimize=False):
+    """Load program bytes using the cache."""
+    with io.BytesIO(program) as stream:
+        return cache.load_program(stream, LogoVM.__version__, optimize)
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_cache_hit(tmp_path, program_code, optimize):
+    """Test cached programs are the same as loaded programs."""
+    program = program_code("circle_area")
+    with io.BytesIO(program) as stream:
+        osinit, code, data, debug = LogoVMLoader.load_program(
+            stream, LogoVM.__version__
+        )
+    if optimize:
+        code = PeepholeOptimizer.optimize(code)
+    cache = ProgramCache(tmp_path)
+    for _ in range(2):
+        cached = cached_load(cache, program, optimize)
+        assert (osinit, code, data) == cached[:3]
+        assert debug.data_symbols == cached[3].data_symbols
+    assert 1 == len(os.listdir(tmp_path))
+
+
+def test_cache_invalid_entry(tmp_path, program_code):
+    """Test invalid cache entries are replaced."""
+    program = program_code("hello")
+    cache = ProgramCache(tmp_path)
+    expected = cached_load(cache, program)
+    (entry,) = tmp_path.iterdir()
+    entry.write_bytes(b"LVMC garbage")
+    assert expected[:3] == cached_load(cache, program)[:3]
+    assert entry.read_bytes().startswith(ProgramCache.MAGIC)
+
+
+def test_cache_eviction(tmp_path, program_code):
+    """Test least recently used entries are evicted."""
+    cache = ProgramCache(tmp_path, max_size=0)
+    cached_load(cache, program_code("hello"))
+    assert [] == os.listdir(tmp_path)
+    cache.max_size = 2**20
+    names = ["hello", "loop", "square"]
+    for time, name in enumerate(names):
+        cached_load(cache, program_code(name))
+        key = ProgramCache.key(program_code(name), LogoVM.__version__)
+        os.utime(tmp_path / f"{key}{cache.SUFFIX}", (time, time))
+    sizes = {
+        entry.stat().st_mtime: entry.stat().st_size
+        for entry in tmp_path.iterdir()
+    }
+    cache.max_size = sizes[1] + sizes[2]
+    cache.evict()
+    assert 2 == len(os.listdir(tmp_path))
+    assert {1, 2} == {entry.stat().st_mtime for entry in tmp_path.iterdir()}
+
+
+def test_cache_write_error(tmp_path, program_code, monkeypatch):
+    """Test failed cache writes do not leave temporary files."""
+
+    def fail_replace(*_args):
+        raise OSError("replace failed")
+
+    monkeypatch.setattr(os, "replace", fail_replace)
+    program = program_code("hello")
+    cache = ProgramCache(tmp_path)
+    with io.BytesIO(program) as stream:
+        expected = LogoVMLoader.load_program(stream, LogoVM.__version__)
+    assert expected[:3] == cached_load(cache, program)[:3]
+    assert [] == os.listdir(tmp_path)
@@ -0,0 +1,63 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Concurrent execution tests."""
+
+import io
+from concurrent.futures import ThreadPoolExecutor
+from random import Random
+
+from example_programs import gen_program, LogoOSHeader
+
+from logovm.logoos import LogoOS
+
+# INTR 2 (READ); RAND; PUSHI 2; INTR 1 (WRITE); HALT
+ECHO_RAND = [159, 2, 3, 160, 2, 159, 1, 1]
+
+
+def run(logovm, program, engine, datain, seed=None):
+    """Run a LogoOS program, and return its output."""
+    with (
+        io.StringIO(datain) as stdin,
+        io.StringIO() as stdout,
+        io.StringIO() as stderr,
+        io.BytesIO(program) as stream,
+    ):
+        testvm = logovm(stream, LogoOS, engine=engine, seed=seed)
+        testvm.execute(stdin=stdin, stdout=stdout, stderr=stderr)
+        return stdout.getvalue() + stderr.getvalue()
+
+
+def test_concurrent_machines(logovm, program_code):
+    """Test concurrent machines produce the same output as sequential."""
+    echo = gen_program(ECHO_RAND, None, LogoOSHeader("LogoOS", (0, 2), ""))
+    programs = [
+        (program_code("circle_area"), "5\n", None),
+        (program_code("loop"), "", None),
+        (echo, "line\n", 42),
+    ]
+    jobs = [
+        (program, engine, f"{index}\n" if datain else "", seed)
+        for index in range(50)
+        for program, datain, seed in programs
+        for engine in ("threaded", "table", "compiled")
+    ]
+    expected = [run(logovm, *job) for job in jobs]
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        observed = list(executor.map(lambda job: run(logovm, *job), jobs))
+    assert expected == observed
+    assert f"49{Random(42).random()}" == expected[-1]
@@ -0,0 +1,102 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Console streams tests."""
+
+import asyncio
+import io
+
+from logovm.console import (
+    BufferedOutput,
+    PrefetchedInput,
+    StreamInput,
+    StreamOutput,
+)
+from logovm.logoos import LogoOS
+from logovm.scheduler import Scheduler
+
+
+def test_buffered_output(logovm, program_code):
+    """Test output is written at the threshold, and on HALT."""
+    with io.StringIO() as stdout:
+        output = BufferedOutput(stdout, threshold=4)
+        output.write("abc")
+        assert "" == stdout.getvalue()
+        output.write("d")
+        assert "abcd" == stdout.getvalue()
+        output.write("e")
+        with io.BytesIO(program_code("loop")) as program:
+            logovm(program, LogoOS).execute(stdout=output)
+        assert "abcde321\n" == stdout.getvalue()
+
+
+def test_prefetched_input():
+    """Test input is read in blocks, and prompts are flushed."""
+    with io.StringIO("first\nsecond\n5") as stdin:
+        prefetched = PrefetchedInput(stdin, chunk_size=8)
+        assert ["first\n", "second\n", "5", ""] == [
+            prefetched.readline() for _ in range(4)
+        ]
+    with io.StringIO("a\x0cb\nc\u2028d\n") as stdin:
+        prefetched = PrefetchedInput(stdin)
+        assert ["a\x0cb\n", "c\u2028d\n"] == [
+            prefetched.readline() for _ in range(2)
+        ]
+    with io.StringIO("5\n") as stdin, io.StringIO() as stdout:
+        output = BufferedOutput(stdout)
+        output.write("Prompt: ")
+        assert "5\n" == PrefetchedInput(stdin, output).readline()
+        assert "Prompt: " == stdout.getvalue()
+
+
+class FakeWriter:  # pylint: disable=too-few-public-methods
+    """Stream writer storing data in memory."""
+
+    def __init__(self):
+        """Initialize writer."""
+        self.data = b""
+
+    def write(self, data):
+        """Store data."""
+        self.data += data
+
+    async def drain(self):
+        """Nothing to wait."""
+
+
+def test_stream_console(logovm, program_code):
+    """Test machines scheduled with asyncio streams."""
+
+    async def main():
+        reader = asyncio.StreamReader()
+        writer = FakeWriter()
+        with io.BytesIO(program_code("circle_area")) as program:
+            testvm = logovm(program, LogoOS)
+        scheduler = Scheduler()
+        session = scheduler.spawn(
+            testvm, stdin=StreamInput(reader), stdout=StreamOutput(writer)
+        )
+        await asyncio.sleep(0)
+        assert b"Circle ray: " == writer.data
+        reader.feed_data(b"1")
+        reader.feed_data(b"0\n")
+        reader.feed_eof()
+        await scheduler.join()
+        assert session.pump.done()
+        return writer.data
+
+    assert b"Circle ray: Circle area: 314.1592\n" == asyncio.run(main())
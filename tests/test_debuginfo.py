@@ -0,0 +1,99 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Debug information tests."""
+
+import io
+
+from example_programs import gen_program, LogoOSHeader
+
+from logovm.loader import LogoVMLoader
+from logovm.logoos import LogoOS
+from logovm.machine import LogoVM
+from logovm.profiler import Profiler
+
+FAILING = [
+    134,
+    3,  # CALL sub       ; main.logo:1
+    1,  # HALT           ; main.logo:2
+    224,
+    "text",  # PUSHS "text"  ; sub: sub.logo:10
+    160,
+    1,  # PUSHI 1
+    30,  # ADD           ; sub.logo:11
+    2,  # RET
+]
+FAILING_DEBUG = [
+    ("F", "main.logo"),
+    ("L", 0, 1),
+    ("L", 1, 2),
+    ("S", 0, "main"),
+    ("F", "sub.logo"),
+    ("L", 2, 10),
+    ("L", 4, 11),
+    ("S", 2, "sub"),
+]
+
+
+def load(code, data=None, debug=None):
+    """Load a LogoOS program."""
+    header = LogoOSHeader("LogoOS", (0, 2), "")
+    program = gen_program(code, data, header, debug)
+    with io.BytesIO(program) as stream:
+        return LogoVMLoader.load_program(stream, LogoVM.__version__)
+
+
+def test_debug_records():
+    """Test decoding of debug records."""
+    _, _, _, debug = load(FAILING, (("answer", 4.2),), FAILING_DEBUG)
+    assert [("answer", "d")] == debug.data_symbols
+    assert ("main.logo", 2) == debug.location(1)
+    assert ("sub.logo", 10) == debug.location(3)
+    assert ("sub", 1) == debug.symbol(3)
+    assert "sub.logo:11, sub+2" == debug.describe(4)
+    assert "main.logo:1, main" == debug.describe(0)
+    relocated = debug.relocated([0, 1, 2, 4, 5])
+    assert "sub.logo:11, sub+2" == relocated.describe(3)
+    _, _, _, debug = load(FAILING)
+    assert not debug
+    assert debug.describe(0) is None
+
+
+def test_error_source_location(capsys):
+    """Test errors report the source location of the failing code."""
+    osinit, *machine_data = load(FAILING, None, FAILING_DEBUG)
+    testvm = LogoVM()
+    testvm.setup(*machine_data)
+    LogoOS(testvm, osinit)
+    testvm.execute()
+    output = capsys.readouterr().err
+    assert "PC=4 (sub.logo:11, sub+2)" in output
+    assert "    0 (main.logo:1, main)" in output
+
+
+def test_profile_source_location():
+    """Test profile reports include source locations."""
+    osinit, *machine_data = load([8, 1], None, FAILING_DEBUG)
+    testvm = LogoVM()
+    testvm.setup(*machine_data)
+    LogoOS(testvm, osinit)
+    profiler = Profiler(testvm)
+    profiler.install()
+    testvm.push(1)
+    testvm.execute()
+    report = profiler.report()
+    assert "main.logo:2, main+1" == report["pcs"][1]["location"]
@@ -17,7 +17,7 @@
 
 """Program execution tests."""
 
-# pylint: disable=too-many-arguments
+# pylint: disable=too-many-arguments,too-many-positional-arguments
 
 import io
 
@@ -26,6 +26,8 @@ from textwrap import dedent
 
 import pytest  # pylint: disable=import-error
 
+from logovm.loader import LogoVMLoader
+from logovm.machine import LogoVM
 from logovm.logoos import LogoOS
 from logovm.turtleos import TurtleOS
 
@@ -36,11 +38,15 @@ from logovm.turtleos import TurtleOS
         ("hello", None, "Hello World!\n"),
         ("hello2", None, "Hello World!\n"),
         ("swap", None, "1"),
+        ("loop", None, "321\n"),
         ("circle_area", "5\n", "Circle ray: Circle area: 78.5398\n"),
     ],
 )
 @pytest.mark.parametrize("vmos", [LogoOS, TurtleOS])
-def test_program_with_os(logovm, program_code, datain, dataout, name, vmos):
+@pytest.mark.parametrize("engine", LogoVM.ENGINES)
+def test_program_with_os(
+    logovm, program_code, datain, dataout, name, vmos, engine
+):
     """Test execution of example programs."""
     with (
         io.StringIO() as stdout,
@@ -48,7 +54,7 @@ def test_program_with_os(logovm, program_code, datain, dataout, name, vmos):
         io.StringIO() as stderr,
         io.BytesIO(program_code(name)) as program,
     ):
-        logovm(program, vmos).execute(
+        logovm(program, vmos, engine=engine).execute(
             stdin=stdin, stdout=stdout, stderr=stderr
         )
         observed = stdout.getvalue()
@@ -132,3 +138,24 @@ def test_program_with_graphics(
     assert err_output == "", "Stderr is not empty."
     assert dataout == observed, "Mismatch in stdout."
     assert dedent(graphic_out) == graphic_result, "Mismatch in graphic file."
+
+
+def test_video_memory(program_code):
+    """Test video memory is a byte buffer, optionally viewed by NumPy."""
+    with io.BytesIO(program_code("square")) as program:
+        osinit, *machine_data = LogoVMLoader.load_program(
+            program, LogoVM.__version__
+        )
+    testvm = LogoVM()
+    testvm.setup(*machine_data)
+    turtle_os = TurtleOS(testvm, osinit)
+    with io.StringIO() as stdout, patch("builtins.open", mock_open()):
+        testvm.execute(stdout=stdout)
+    mem = turtle_os.video.mem
+    assert isinstance(mem, bytearray)
+    assert 10 * 10 == len(mem)
+    assert 36 == mem.count(255)
+    pixels = turtle_os.pixels
+    if pixels is not None:  # pragma: no cover
+        assert (10, 10) == pixels.shape
+        assert 36 == (pixels == 255).sum()
@@ -0,0 +1,64 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Compact heap tests."""
+
+import io
+
+import pytest  # pylint: disable=import-error
+
+from logovm.heap import CompactHeap
+from logovm.logoos import LogoOS
+
+
+def test_compact_heap_values():
+    """Test values stored in the compact heap keep their types."""
+    values = [1, -(2**63), 2.5, "text", 2**70]
+    heap = CompactHeap(values)
+    assert values == list(heap)
+    assert [int, int, float, str, int] == [type(value) for value in heap]
+
+
+@pytest.mark.parametrize("value", [3, 0.5, "other", 2**64, None])
+@pytest.mark.parametrize("initial", [1, 1.5, "text"])
+def test_compact_heap_store(initial, value):
+    """Test storing values of a different kind in a slot."""
+    heap = CompactHeap([initial, "keep"])
+    heap[0] = value
+    assert [value, "keep"] == list(heap)
+    heap[0] = initial
+    assert [initial, "keep"] == list(heap)
+
+
+@pytest.mark.parametrize(
+    "name, dataout",
+    [
+        ("hello", "Hello World!\n"),
+        ("circle_area", "Circle ray: Circle area: 78.5398\n"),
+    ],
+)
+def test_program_with_compact_heap(logovm, program_code, name, dataout):
+    """Test execution of programs using the compact heap."""
+    with (
+        io.StringIO() as stdout,
+        io.StringIO("5\n") as stdin,
+        io.BytesIO(program_code(name)) as program,
+    ):
+        testvm = logovm(program, LogoOS, heap="compact")
+        assert isinstance(testvm.mem.heap, CompactHeap)
+        testvm.execute(stdin=stdin, stdout=stdout)
+        assert dataout == stdout.getvalue()
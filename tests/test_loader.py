@@ -0,0 +1,215 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Program loader tests."""
+
+import io
+import os
+import struct
+
+import pytest  # pylint: disable=import-error
+
+from example_programs import gen_program, LogoOSHeader
+
+from logovm.errors import InvalidLogoFile
+from logovm.loader import LazyCode, LogoVMLoader, PackedCode
+from logovm.logoos import LogoOS
+from logovm.machine import LogoVM
+
+
+@pytest.mark.parametrize("name", ["hello", "circle_area", "loop", "square"])
+def test_load_mapped_file(tmp_path, program_code, name):
+    """Test loading a program file with mmap, and from a stream."""
+    filename = tmp_path / f"{name}.logox"
+    filename.write_bytes(program_code(name))
+    with open(filename, "rb") as progfile:
+        mapped = LogoVMLoader.load_program(progfile, LogoVM.__version__)
+    with io.BytesIO(program_code(name)) as stream:
+        loaded = LogoVMLoader.load_program(stream, LogoVM.__version__)
+    assert mapped[:3] == loaded[:3]
+    assert mapped[3].data == loaded[3].data
+
+
+def test_load_pipe(program_code):
+    """Test loading a program from a pipe, that cannot be mapped."""
+    reader, writer = os.pipe()
+    with open(reader, "rb") as pipe:
+        with open(writer, "wb") as stream:
+            stream.write(program_code("hello"))
+        loaded = LogoVMLoader.load_program(pipe, LogoVM.__version__)
+    with io.BytesIO(program_code("hello")) as stream:
+        expected = LogoVMLoader.load_program(stream, LogoVM.__version__)
+    assert expected[:3] == loaded[:3]
+
+
+def test_load_data_types():
+    """Test loading every data type."""
+    data = (("count", -42), ("ratio", 0.5), ("name", "name"))
+    code = [224, "hello", 160, -1, 128, 2, 192, 2.5, 1]
+    program = gen_program(code, data, LogoOSHeader("LogoOS", (0, 2), ""))
+    with io.BytesIO(program) as stream:
+        _, code, data, debug = LogoVMLoader.load_program(
+            stream, LogoVM.__version__
+        )
+    assert [(224, "hello"), (160, -1), (128, 2), (192, 2.5), (1,)] == code
+    assert [-42, 0.5, "name"] == data
+    assert [("count", "i"), ("ratio", "d"), ("name", "s")] == (
+        debug.data_symbols
+    )
+
+
+@pytest.mark.parametrize("index", [False, True])
+def test_lazy_code(tmp_path, index):
+    """Test lazy code decodes the same instructions as the loader."""
+    code = [224, "text", 160, -1, 8, 128, 0, 192, 2.5, 8, 8, 1]
+    program = gen_program(
+        code, (("x", 1),), LogoOSHeader("LogoOS", (0, 2), ""), index=index
+    )
+    filename = tmp_path / "lazy.logox"
+    filename.write_bytes(program)
+    with open(filename, "rb") as progfile:
+        _, lazy, data, _ = LogoVMLoader.load_program(
+            progfile, LogoVM.__version__, lazy=True
+        )
+    with io.BytesIO(program) as stream:
+        _, eager, *_ = LogoVMLoader.load_program(stream, LogoVM.__version__)
+    assert isinstance(lazy, LazyCode)
+    assert [None] * len(eager) == lazy.decoded
+    assert eager[2] == lazy[2]
+    assert [None, None, eager[2]] == lazy.decoded[:3]
+    assert eager == list(lazy)
+    assert eager[-3:] == lazy[-3:]
+    assert [1] == data
+
+
+@pytest.mark.parametrize("engine", LogoVM.ENGINES)
+def test_run_lazy_code(program_code, engine):
+    """Test running programs with lazy code."""
+    with (
+        io.StringIO() as stdout,
+        io.BytesIO(program_code("loop")) as stream,
+    ):
+        osinit, *machine_data = LogoVMLoader.load_program(
+            stream, LogoVM.__version__, lazy=True
+        )
+        testvm = LogoVM(engine=engine)
+        testvm.setup(*machine_data)
+        LogoOS(testvm, osinit)
+        testvm.execute(stdout=stdout)
+        assert "321\n" == stdout.getvalue()
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("name", ["hello", "circle_area", "loop", "square"])
+def test_load_records_format(program_code, name, lazy):
+    """Test programs with fixed width records load the same code."""
+    with io.BytesIO(program_code(name)) as stream:
+        expected = LogoVMLoader.load_program(stream, LogoVM.__version__)
+    with io.BytesIO(program_code(name, version=(0, 3))) as stream:
+        loaded = LogoVMLoader.load_program(
+            stream, LogoVM.__version__, lazy=lazy
+        )
+    assert expected[0] == loaded[0]
+    assert expected[1] == list(loaded[1])
+    assert expected[2] == loaded[2]
+
+
+def test_records_string_pool():
+    """Test strings in the pool are deduplicated."""
+    code = [224, "a", 224, "b", 224, "a", 192, -0.5, 128, 2**64 - 1, 1]
+    program = gen_program(
+        code, None, LogoOSHeader("LogoOS", (0, 2), ""), version=(0, 3)
+    )
+    assert 1 == program.count(b"a\0")
+    with io.BytesIO(program) as stream:
+        _, code, _, _ = LogoVMLoader.load_program(stream, LogoVM.__version__)
+    assert [
+        (224, "a"),
+        (224, "b"),
+        (224, "a"),
+        (192, -0.5),
+        (128, 2**64 - 1),
+        (1,),
+    ] == code
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("version", [(0, 2), (0, 3)])
+@pytest.mark.parametrize("compress", ["zlib", "lzma"])
+def test_load_compressed_sections(
+    tmp_path, program_code, compress, version, lazy
+):
+    """Test compressed sections load the same program."""
+    with io.BytesIO(program_code("circle_area", version=version)) as stream:
+        expected = LogoVMLoader.load_program(stream, LogoVM.__version__)
+    filename = tmp_path / "compressed.logox"
+    filename.write_bytes(
+        program_code("circle_area", version=version, compress=compress)
+    )
+    with open(filename, "rb") as progfile:
+        loaded = LogoVMLoader.load_program(
+            progfile, LogoVM.__version__, lazy=lazy
+        )
+    assert expected[0] == loaded[0]
+    assert expected[1] == list(loaded[1])
+    assert expected[2] == loaded[2]
+    assert expected[3].data_symbols == loaded[3].data_symbols
+
+
+@pytest.mark.parametrize("compress", ["zlib", "lzma"])
+@pytest.mark.parametrize("change", [-1, 1, 2**40])
+def test_invalid_compressed_size(program_code, compress, change):
+    """Test compressed sections with a wrong decompressed size."""
+    program = bytearray(program_code("circle_area", compress=compress))
+    # decompressed size follows the marks, method and compressed size.
+    offset = program.index(b".ZSEC.CODE") + 19
+    (size,) = struct.unpack_from("<Q", program, offset)
+    struct.pack_into("<Q", program, offset, size + change)
+    with io.BytesIO(program) as stream:
+        with pytest.raises(InvalidLogoFile, match="compressed section size"):
+            LogoVMLoader.load_program(stream, LogoVM.__version__)
+
+
+def test_packed_code():
+    """Test packed code stores every argument type."""
+    code = [(224, "a"), (160, -1), (224, "a"), (192, 2.5), (128, 2**64 - 1)]
+    code.append((1,))
+    packed = PackedCode(code)
+    assert code == list(packed)
+    assert code[1:3] == packed[1:3]
+    assert ["a"] == packed.strings
+    assert [224, 160, 224, 192, 128, 1] == list(packed.opcodes)
+    assert [0, -1, 0, 0, -1, 0] == list(packed.operands)
+
+
+@pytest.mark.parametrize("version", [(0, 2), (0, 3)])
+@pytest.mark.parametrize("engine", LogoVM.ENGINES)
+def test_run_packed_code(program_code, engine, version):
+    """Test loading and running programs with packed code."""
+    with (
+        io.StringIO() as stdout,
+        io.BytesIO(program_code("loop", version=version)) as stream,
+    ):
+        osinit, code, *machine_data = LogoVMLoader.load_program(
+            stream, LogoVM.__version__, packed=True
+        )
+        assert isinstance(code, PackedCode)
+        testvm = LogoVM(engine=engine)
+        testvm.setup(code, *machine_data)
+        LogoOS(testvm, osinit)
+        testvm.execute(stdout=stdout)
+        assert "321\n" == stdout.getvalue()
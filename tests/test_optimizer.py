@@ -0,0 +1,81 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Peephole optimizer tests."""
+
+import io
+
+import pytest  # pylint: disable=import-error
+
+from logovm.loader import LogoVMLoader
+from logovm.logoos import LogoOS
+from logovm.machine import LogoVM
+from logovm.optimizer import PeepholeOptimizer, CMPJ, INCH, INTRI, ADDI
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        (
+            [(128, 0), (160, 1), (30,), (140, 0), (1,)],
+            [(INCH, 0, 1), (1,)],
+        ),
+        (
+            [(160, 1), (30,), (25,), (130, 0), (1,)],
+            [(ADDI, 1), (CMPJ, 130, 0), (1,)],
+        ),
+        (  # jump into the middle of a pattern prevents fusing it.
+            [(160, 1), (30,), (129, 1)],
+            [(160, 1), (30,), (129, 1)],
+        ),
+        (  # skipped instructions are not fused.
+            [(6,), (160, 1), (159, 1), (1,)],
+            [(6,), (160, 1), (159, 1), (1,)],
+        ),
+        (  # jump targets and relative jumps are remapped.
+            [(160, 1), (159, 1), (161, 3), (0,), (0,), (129, 2)],
+            [(INTRI, 1, 1), (161, 3), (0,), (0,), (129, 1)],
+        ),
+    ],
+)
+def test_optimize(code, expected):
+    """Test superinstruction generation."""
+    assert expected == PeepholeOptimizer.optimize(code)
+    origins = [7]
+    assert expected == PeepholeOptimizer.optimize(code, origins)
+    assert len(expected) + 1 == len(origins)
+
+
+@pytest.mark.parametrize("name", ["hello", "swap", "loop", "circle_area"])
+@pytest.mark.parametrize("engine", LogoVM.ENGINES)
+def test_optimized_program(program_code, name, engine):
+    """Test that optimized programs behave as the original ones."""
+    outputs = []
+    for optimize in (False, True):
+        logovm = LogoVM(engine=engine)
+        with io.BytesIO(program_code(name)) as program:
+            osinit, code, *data = LogoVMLoader.load_program(
+                program, LogoVM.__version__
+            )
+        if optimize:
+            code = PeepholeOptimizer.optimize(code)
+        logovm.setup(code, *data)
+        LogoOS(logovm, osinit)
+        with io.StringIO() as stdout, io.StringIO("5\n") as stdin:
+            logovm.execute(stdin=stdin, stdout=stdout)
+            outputs.append(stdout.getvalue())
+    assert outputs[0] == outputs[1]
@@ -0,0 +1,85 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Machine pool tests."""
+
+import io
+from unittest.mock import mock_open, patch
+
+import pytest  # pylint: disable=import-error
+
+from logovm.loader import LogoVMLoader
+from logovm.machine import LogoVM
+from logovm.pool import ProgramImage, VMPool
+from logovm.turtleos import TurtleOS
+
+
+@pytest.mark.parametrize("heap", ["list", "compact"])
+@pytest.mark.parametrize("engine", LogoVM.ENGINES)
+def test_pool_reuses_machines(program_code, engine, heap):
+    """Test pooled machines are reset between runs."""
+    with io.BytesIO(program_code("circle_area")) as stream:
+        image = ProgramImage.load(stream)
+    pool = VMPool(image, size=1, engine=engine, heap=heap)
+    machines = set()
+    for ray in [1, 2, 1]:
+        with (
+            pool.machine() as machine,
+            io.StringIO(f"{ray}\n") as stdin,
+            io.StringIO() as stdout,
+        ):
+            machines.add(machine)
+            machine.execute(stdin=stdin, stdout=stdout)
+            assert stdout.getvalue().startswith("Circle ray:")
+            assert str(3.141592 * ray**2)[:5] in stdout.getvalue()
+    assert 1 == len(machines)
+    assert list(image.data) == list(machine.mem.heap)
+    assert 0 == len(machine.mem.stack)
+
+
+def test_reset_turtleos(program_code):
+    """Test TurtleOS video memory and turtle are reset."""
+    with io.BytesIO(program_code("square")) as stream:
+        osinit, *machine_data = LogoVMLoader.load_program(
+            stream, LogoVM.__version__
+        )
+    testvm = LogoVM()
+    testvm.setup(*machine_data)
+    turtle_os = TurtleOS(testvm, osinit)
+    initial = (turtle_os.turtle, testvm.flags)
+    with io.StringIO() as stdout, patch("builtins.open", mock_open()):
+        testvm.execute(stdout=stdout)
+        testvm.reset()
+        testvm.execute(stdout=stdout)
+        assert "000.0000.0" == stdout.getvalue()
+    assert any(turtle_os.video.mem)
+    testvm.reset()
+    assert not any(turtle_os.video.mem)
+    assert initial == (turtle_os.turtle, testvm.flags)
+
+
+def test_reset_console(program_code, capsys):
+    """Test streams given to a run are not used by the next one."""
+    with io.BytesIO(program_code("hello")) as stream:
+        pool = VMPool(ProgramImage.load(stream), size=1)
+    with io.StringIO() as stdout:
+        pool.execute(stdout=stdout)
+        expected = stdout.getvalue()
+    pool.execute()
+    captured = capsys.readouterr()
+    assert "" == captured.err
+    assert expected == captured.out
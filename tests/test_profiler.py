@@ -0,0 +1,58 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Profiler tests."""
+
+import io
+import json
+
+import pytest  # pylint: disable=import-error
+
+from logovm.logoos import LogoOS
+from logovm.profiler import Profiler
+
+
+@pytest.mark.parametrize("interval", [1, 4])
+def test_profile_loop(logovm, program_code, interval):
+    """Test profiling a program with a loop and a subroutine."""
+    with (
+        io.StringIO() as stdout,
+        io.BytesIO(program_code("loop")) as program,
+    ):
+        testvm = logovm(program, LogoOS)
+        profiler = Profiler(testvm, interval)
+        profiler.install()
+        testvm.execute(stdout=stdout)
+        assert "321\n" == stdout.getvalue()
+    report = json.loads(json.dumps(profiler.report()))
+    assert report["instructions"] == sum(
+        entry["count"] for entry in report["pcs"].values()
+    )
+    assert report["instructions"] == sum(report["opcodes"].values())
+    if interval == 1:
+        assert 35 == report["instructions"]
+        assert 3 == report["opcodes"]["CMP"]
+        call = report["calls"]["13"]
+        assert (1, 4, 4) == (
+            call["count"],
+            call["inclusive"],
+            call["exclusive"],
+        )
+        assert 4 == report["interrupts"]["1"]["count"]
+    assert "Hot instructions:" in profiler.format_report()
+    profiler.uninstall()
+    assert not testvm.traced
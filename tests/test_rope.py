@@ -0,0 +1,82 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Rope string tests."""
+
+import pytest  # pylint: disable=import-error
+
+from logovm.machine import LogoVM
+from logovm.rope import Rope, StrView, concat, substring
+
+
+def test_rope_shared_parts():
+    """Test ropes appended from the same rope keep their own values."""
+    base = concat("a" * 300, "b")
+    first = concat(base, "c")
+    second = concat(base, "d")
+    assert isinstance(base, Rope)
+    assert "a" * 300 + "b" == str(base)
+    assert "a" * 300 + "bc" == str(first)
+    assert "a" * 300 + "bd" == str(second)
+    assert str(concat(first, second)) == str(first) + str(second)
+    assert concat("x", "y") == "xy"
+
+
+def test_string_views():
+    """Test substrings of long strings are views."""
+    text = "0123456789" * 50
+    view = substring(text, 10, 400)
+    assert isinstance(view, StrView)
+    assert text[10:400] == str(view)
+    assert text[20:30] == view[10:20]
+    assert text[20:410] == str(substring(view, 10, 400))
+    assert isinstance(view[:300], StrView)
+    assert "3" == view[3]
+    assert "9" == view[-1]
+    with pytest.raises(IndexError):
+        view[390]  # pylint: disable=pointless-statement
+    assert view < "1" and view != "0123"
+
+
+@pytest.mark.parametrize("engine", LogoVM.ENGINES)
+def test_cat_loop(engine):
+    """Test building a long string with CAT, and splitting it."""
+    code = [
+        (224, ""),  # PUSHS ""
+        (160, 100),  # PUSHI 100
+        (24,),  # SWAP          ; loop:
+        (224, "abcd"),  # PUSHS "abcd"
+        (125,),  # CAT
+        (24,),  # SWAP
+        (160, -1),  # PUSHI -1
+        (30,),  # ADD
+        (9,),  # DUP
+        (160, 0),  # PUSHI 0
+        (25,),  # CMP
+        (133, 2),  # JNZ loop
+        (8,),  # POP
+        (160, 398),  # PUSHI 398
+        (126,),  # SCHOP
+        (1,),  # HALT
+    ]
+    logovm = LogoVM(engine=engine)
+    logovm.setup(code, [])
+    logovm.execute()
+    tail, head = logovm.mem.stack.peek_n(2)
+    assert "cd" == tail
+    assert "abcd" * 99 + "ab" == str(head)
+    assert 398 == len(head)
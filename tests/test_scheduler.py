@@ -0,0 +1,108 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Stepping API and scheduler tests."""
+
+import asyncio
+import io
+
+import pytest  # pylint: disable=import-error
+
+from logovm.logoos import LogoOS
+from logovm.machine import LogoVM
+from logovm.scheduler import Scheduler
+
+
+@pytest.mark.parametrize("engine", LogoVM.ENGINES)
+def test_run_quantum(logovm, program_code, engine):
+    """Test programs run in quanta produce the same output."""
+    with (
+        io.StringIO() as stdout,
+        io.BytesIO(program_code("loop")) as program,
+    ):
+        testvm = logovm(program, LogoOS, engine=engine)
+        testvm.start(stdout=stdout)
+        quanta = 1
+        while testvm.run(5):
+            quanta += 1
+        assert "321\n" == stdout.getvalue()
+    assert quanta > 2
+    assert not testvm.step()
+
+
+def test_shutdown_once():
+    """Test shutdown is called once, and stopped programs do not run."""
+    shutdowns = []
+    testvm = LogoVM()
+    testvm.setup([(160, 1), (8,), (1,)], [])
+    testvm.set_interrupt(0, shutdowns.append)
+    assert not testvm.run()
+    testvm.start()
+    assert testvm.step()
+    while testvm.run(1):
+        pass
+    assert not testvm.run()
+    assert not testvm.step()
+    assert not testvm.run(10)
+    assert [testvm] == shutdowns
+    assert 3 == testvm.instructions
+
+
+def test_shutdown_after_error():
+    """Test shutdown is not called after a program fails."""
+    shutdowns = []
+    testvm = LogoVM()
+    testvm.setup([(8,), (1,)], [])
+    testvm.set_interrupt(0, shutdowns.append)
+    with io.StringIO() as stderr:
+        testvm.start(stderr=stderr)
+        assert not testvm.run()
+        assert not testvm.run()
+        assert stderr.getvalue()
+    assert not shutdowns
+
+
+def test_scheduler_sessions(logovm, program_code):
+    """Test scheduler interleaves sessions, and parks them on READ."""
+
+    async def main():
+        scheduler = Scheduler(quantum=3)
+        sessions = []
+        for ray in range(50):
+            with io.BytesIO(program_code("circle_area")) as program:
+                testvm = logovm(program, LogoOS)
+            session = scheduler.spawn(testvm, stdout=io.StringIO())
+            sessions.append((ray, session))
+        await asyncio.sleep(0.01)
+        assert all(session.machine.suspended for _, session in sessions)
+        for ray, session in reversed(sessions):
+            session.feed(f"{ray}")
+            session.close()
+        await scheduler.join()
+        return [
+            (ray, session.machine.console[1].getvalue())
+            for ray, session in sessions
+        ]
+
+    for ray, output in asyncio.run(main()):
+        with (
+            io.StringIO(f"{ray}\n") as stdin,
+            io.StringIO() as stdout,
+            io.BytesIO(program_code("circle_area")) as program,
+        ):
+            logovm(program, LogoOS).execute(stdin=stdin, stdout=stdout)
+            assert stdout.getvalue() == output
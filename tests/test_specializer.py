@@ -0,0 +1,87 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Adaptive specialization tests."""
+
+import pytest  # pylint: disable=import-error
+
+from logovm.machine import LogoVM
+from logovm.specializer import AdaptiveSpecializer
+
+
+def counter_loop(start, step, count):
+    """Return code that adds 'step' to 'start' 'count' times."""
+    return [
+        (160, count),  # PUSHI count
+        (start[0], start[1]),  # PUSH start
+        (step[0], step[1]),  # PUSH step      ; loop:
+        (30,),  # ADD
+        (24,),  # SWAP
+        (160, 1),  # PUSHI 1
+        (31,),  # SUB
+        (9,),  # DUP
+        (160, 0),  # PUSHI 0
+        (25,),  # CMP
+        (132, 14),  # JZ end
+        (24,),  # SWAP
+        (129, 2),  # JP loop
+        (1,),  # HALT
+        (8,),  # POP          ; end:
+        (1,),  # HALT
+    ]
+
+
+@pytest.mark.parametrize(
+    "start, step, expected",
+    [
+        ((160, 0), (160, 3), 60),
+        ((192, 0.5), (192, 0.25), 5.5),
+        ((160, 0), (192, 0.5), 10.0),
+    ],
+)
+def test_specialized_loop(start, step, expected):
+    """Test loops running with specialized instructions."""
+    logovm = LogoVM(engine="adaptive")
+    logovm.setup(counter_loop(start, step, 20), [])
+    logovm.execute()
+    assert [expected] == logovm.mem.stack.peek_n(len(logovm.mem.stack))
+
+
+def test_deoptimization():
+    """Test guard failure falling back to the generic operation."""
+    logovm = LogoVM()
+    logovm.setup([(30,), (1,)], [])
+    stack = logovm.mem.stack
+    generic = []
+    specializer = AdaptiveSpecializer(logovm, [lambda: generic.append(1)])
+    specializer.install()
+
+    def execute(*values):
+        stack.clear()
+        for value in values:
+            stack.push(value)
+        specializer.threaded[0]()
+        return stack.peek_n(len(stack))
+
+    for _ in range(specializer.warmup):
+        execute(1, 2)
+    assert len(generic) == specializer.warmup
+    assert [3] == execute(1, 2)
+    assert len(generic) == specializer.warmup
+    execute(1, 2.0)
+    assert len(generic) == specializer.warmup + 1
+    assert 1 == specializer.deopts[0]
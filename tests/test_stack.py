@@ -0,0 +1,40 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Machine stack tests."""
+
+import pytest  # pylint: disable=import-error
+
+from logovm.machine import LogoVM, LogoVMEmptyStack, LogoVMStackOverflow
+
+
+def test_bulk_stack_transfer():
+    """Test pushing and popping many values at once."""
+    testvm = LogoVM(maxstack=4)
+    testvm.push_many(iter([1, 2.5, "three"]))
+    assert [2.5, "three"] == testvm.pop_n(2)
+    assert 2.5 == testvm.regs[1]
+    testvm.push_many([4, 5])
+    with pytest.raises(LogoVMStackOverflow):
+        testvm.push_many([6, 7])
+    with pytest.raises(ValueError):
+        testvm.pop_n_type(3, str)
+    assert 3 == len(testvm.mem.stack)
+    assert [1, 4, 5] == testvm.pop_n_type(3, int)
+    assert [] == testvm.pop_n(0)
+    with pytest.raises(LogoVMEmptyStack):
+        testvm.pop_n(1)
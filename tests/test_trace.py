@@ -0,0 +1,67 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Trace hook tests."""
+
+import io
+
+import pytest  # pylint: disable=import-error
+
+from logovm.logoos import LogoOS
+from logovm.errors import LogoVMError
+
+
+@pytest.mark.parametrize("interval", [1, 3])
+def test_trace_hooks(logovm, program_code, interval):
+    """Test trace hooks are called for the traced events."""
+    events = {}
+
+    def hook(event):
+        def record(_logo_vm, pc, value):
+            events.setdefault(event, []).append((pc, value))
+
+        return record
+
+    with (
+        io.StringIO() as stdout,
+        io.BytesIO(program_code("loop")) as program,
+    ):
+        testvm = logovm(program, LogoOS, engine="compiled")
+        for event in testvm.TRACE_EVENTS:
+            testvm.add_trace_hook(event, hook(event), interval)
+        assert testvm.traced
+        testvm.execute(stdout=stdout)
+        assert "321\n" == stdout.getvalue()
+    instructions = events["instruction"]
+    assert all(testvm.code[pc] == value for pc, value in instructions)
+    assert len(instructions) > 10 // interval
+    assert len(events["call"]) == len(events["return"]) > 0
+    assert len(events["interrupt"]) == len(events["interrupt_exit"])
+    for pc, target in events["return"]:
+        assert testvm.code[pc] == (2,)
+        assert testvm.code[target - 1][0] == 134
+
+
+def test_remove_trace_hook(logovm, program_code):
+    """Test removing trace hooks."""
+    with io.BytesIO(program_code("loop")) as program:
+        testvm = logovm(program, LogoOS)
+    testvm.add_trace_hook("call", print)
+    testvm.remove_trace_hook("call", print)
+    assert not testvm.traced
+    with pytest.raises(LogoVMError):
+        testvm.add_trace_hook("jump", print)
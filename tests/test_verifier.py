@@ -0,0 +1,118 @@
+# This file is part of LogoVM
+#
+# Copyright (C) 2023 Rafael Guterres Jeffman
+#
+# This software is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Bytecode verifier tests."""
+
+import io
+
+import pytest  # pylint: disable=import-error
+
+from logovm.errors import VerificationError
+from logovm.logoos import LogoOS
+from logovm.machine import LogoVM
+from logovm.verifier import BytecodeVerifier, COUNTED
+
+EFFECTS = [((), ()), COUNTED, ((), (None,))] + [None] * 13
+
+
+@pytest.mark.parametrize(
+    "code, heap, reason",
+    [
+        ([(8,), (1,)], [], "PC 0: stack underflow"),
+        ([(128, 1), (1,)], [0], "PC 0: invalid heap address 1"),
+        ([(160, 1), (224, "a"), (30,), (1,)], [], "PC 2: expected number"),
+        (
+            [(160, 1), (132, 3), (160, 2), (1,)],
+            [],
+            "PC 3: inconsistent stack depth (1 != 2)",
+        ),
+        ([(134, 2), (1,), (8,), (2,)], [], "PC 0: stack underflow"),
+        ([(0,)], [], "PC 0: invalid jump target 1"),
+    ],
+)
+def test_invalid_program(code, heap, reason):
+    """Test rejected programs."""
+    result = BytecodeVerifier(code, heap, EFFECTS, 16).verify()
+    assert not result.valid
+    assert result.reason.startswith(reason)
+
+
+@pytest.mark.parametrize(
+    "code, heap, proven, typed, max_depth",
+    [
+        ([(160, 1), (160, 2), (30,), (8,), (1,)], [], True, True, 2),
+        ([(159, 2), (160, 2), (30,), (8,), (1,)], [], True, False, 2),
+        ([(128, 0), (160, 1), (30,), (140, 0), (1,)], [1], True, True, 2),
+        (  # subroutine returning a value.
+            [(134, 4), (160, 1), (159, 1), (1,), (224, "x"), (2,)],
+            [],
+            True,
+            True,
+            2,
+        ),
+        ([(160, 1), (160, 1), (159, 1), (1,)], [], True, True, 2),
+        ([(159, 3), (1,)], [], False, False, None),
+    ],
+)
+def test_valid_program(code, heap, proven, typed, max_depth):
+    """Test properties proven for valid programs."""
+    result = BytecodeVerifier(code, heap, EFFECTS, 16).verify()
+    assert result.valid
+    assert (proven, typed, max_depth) == (
+        result.proven,
+        result.typed,
+        result.max_depth,
+    )
+
+
+@pytest.mark.parametrize("heap", ["list", "compact"])
+def test_program_without_data(heap):
+    """Test verifying, and running, a program without a data section."""
+    testvm = LogoVM(heap=heap)
+    testvm.setup([(160, 1), (8,), (1,)])
+    assert testvm.verify().proven
+    testvm.execute()
+    assert 0 == len(testvm.mem.stack)
+
+
+def test_strict_verification():
+    """Test rejection of invalid programs."""
+    logovm = LogoVM()
+    logovm.setup([(8,), (1,)], [])
+    with pytest.raises(VerificationError):
+        logovm.verify(strict=True)
+
+
+@pytest.mark.parametrize("name", ["hello", "swap", "loop", "circle_area"])
+@pytest.mark.parametrize("engine", LogoVM.ENGINES)
+def test_verified_program(logovm, program_code, name, engine):
+    """Test execution of verified programs."""
+    expected = {
+        "hello": "Hello World!\n",
+        "swap": "1",
+        "loop": "321\n",
+        "circle_area": "Circle ray: Circle area: 78.5398\n",
+    }
+    with (
+        io.StringIO() as stdout,
+        io.StringIO("5\n") as stdin,
+        io.BytesIO(program_code(name)) as program,
+    ):
+        testvm = logovm(program, LogoOS, engine=engine)
+        assert testvm.verify(strict=True).proven
+        testvm.execute(stdin=stdin, stdout=stdout)
+        assert expected[name] == stdout.getvalue()